@@ -0,0 +1,121 @@
+"""Similarity cache for follow-up answers, so paraphrased repeat questions skip Gemini."""
+import os
+import threading
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+from metrics import cache_requests
+from readme_index import tokenize
+
+FOLLOWUP_CACHE_THRESHOLD = float(os.getenv("FOLLOWUP_CACHE_THRESHOLD", 0.82))
+FOLLOWUP_CACHE_REPOS = int(os.getenv("FOLLOWUP_CACHE_REPOS", 256))
+FOLLOWUP_CACHE_PER_REPO = int(os.getenv("FOLLOWUP_CACHE_PER_REPO", 64))
+VECTOR_DIM = 2048
+
+STOPWORDS = frozenset(
+    "a an and are as at be can do does for from get got have how i i'm im in is it its me my of on or please "
+    "should so that the there this to up us we what whats where which who why will with would you your".split()
+)
+
+
+def _bucket(feature: str) -> tuple[int, float]:
+    h = zlib.crc32(feature.encode("utf-8"))
+    return h % VECTOR_DIM, 1.0 if h & 0x80000000 else -1.0
+
+
+def question_vector(question: str) -> np.ndarray:
+    """Unit-length hashed bag of content words and adjacent word pairs."""
+    words = [w for w in tokenize(question) if w and w not in STOPWORDS]
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    vector = np.zeros(VECTOR_DIM, dtype=np.float32)
+    for feature in features:
+        index, sign = _bucket(feature)
+        # Pairs weigh less than words so reordered phrasings still match.
+        vector[index] += sign * (1.0 if " " not in feature else 0.5)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class _RepoAnswers:
+    """Answers for one (repo, role, README version), most recently used last."""
+
+    def __init__(self):
+        self.questions = []
+        self.answers = []
+        self.matrix = np.zeros((0, VECTOR_DIM), dtype=np.float32)
+
+    def best(self, vector: np.ndarray) -> tuple[int, float]:
+        if not self.answers:
+            return -1, 0.0
+        sims = self.matrix @ vector
+        i = int(np.argmax(sims))
+        return i, float(sims[i])
+
+    def touch(self, i: int):
+        order = [j for j in range(len(self.answers)) if j != i] + [i]
+        self.questions = [self.questions[j] for j in order]
+        self.answers = [self.answers[j] for j in order]
+        self.matrix = self.matrix[order]
+
+    def add(self, question: str, vector: np.ndarray, answer: str, limit: int):
+        self.questions.append(question)
+        self.answers.append(answer)
+        self.matrix = np.vstack([self.matrix, vector])
+        if len(self.answers) > limit:
+            self.questions, self.answers = self.questions[-limit:], self.answers[-limit:]
+            self.matrix = self.matrix[-limit:]
+
+
+class AnswerCache:
+    """Per-repo follow-up answers matched by cosine similarity of question vectors.
+
+    Entries are keyed by the README digest, so a README change starts a fresh
+    set. Both the repos and the answers within a repo are LRU-bounded.
+    """
+
+    def __init__(self, threshold: float = FOLLOWUP_CACHE_THRESHOLD, max_repos: int = FOLLOWUP_CACHE_REPOS,
+                 max_per_repo: int = FOLLOWUP_CACHE_PER_REPO):
+        self.threshold = threshold
+        self.max_repos = max_repos
+        self.max_per_repo = max_per_repo
+        self.hits = 0
+        self.misses = 0
+        self._repos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, repo_key: tuple, question: str) -> str | None:
+        vector = question_vector(question)
+        with self._lock:
+            entry = self._repos.get(repo_key)
+            i, similarity = entry.best(vector) if entry is not None else (-1, 0.0)
+            if i < 0 or similarity < self.threshold:
+                self.misses += 1
+                cache_requests.inc(cache="followup_answers", result="miss")
+                return None
+            self._repos.move_to_end(repo_key)
+            answer = entry.answers[i]
+            entry.touch(i)
+            self.hits += 1
+        cache_requests.inc(cache="followup_answers", result="hit")
+        return answer
+
+    def put(self, repo_key: tuple, question: str, answer: str):
+        vector = question_vector(question)
+        if not vector.any():
+            # Nothing but stopwords ("what?"): too vague to reuse.
+            return
+        with self._lock:
+            entry = self._repos.get(repo_key)
+            if entry is None:
+                entry = self._repos[repo_key] = _RepoAnswers()
+            self._repos.move_to_end(repo_key)
+            entry.add(question, vector, answer, self.max_per_repo)
+            while len(self._repos) > self.max_repos:
+                self._repos.popitem(last=False)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0,
+                "repos": len(self._repos), "answers": sum(len(e.answers) for e in self._repos.values())}
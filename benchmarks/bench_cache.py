@@ -0,0 +1,78 @@
+"""Compares the old whole-file JSON cache with CacheStore at 10k entries.
+
+Usage: python benchmarks/bench_cache.py [--entries 10000] [--ops 200]
+
+Each "request" mirrors summarize_repo: one lookup, and on a miss one write.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cache_store import CacheStore
+
+SUMMARY = "*📱 About Resell*\nA marketplace app.\n\n*🛠️ Setup Instructions*\n1. `npm install`\n" * 8
+
+
+def json_request(path, key):
+    cache = {}
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            cache = json.load(f)
+    if key in cache:
+        return cache[key]
+    cache[key] = SUMMARY
+    with open(path, "w") as f:
+        json.dump(cache, f, indent=2)
+    return SUMMARY
+
+
+def store_request(store, key):
+    value = store.get(key)
+    if value is not None:
+        return value
+    store.set(key, SUMMARY)
+    return SUMMARY
+
+
+def run(label, fn, keys):
+    start = time.perf_counter()
+    for key in keys:
+        fn(key)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {len(keys):>6} ops  {elapsed * 1000:>9.1f} ms  {elapsed / len(keys) * 1e6:>9.1f} µs/op")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=10_000)
+    parser.add_argument("--ops", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "summaries_cache.json")
+        with open(json_path, "w") as f:
+            json.dump({f"app{i}-backend-beginner": SUMMARY for i in range(args.entries)}, f, indent=2)
+
+        store = CacheStore("bench", path=os.path.join(tmp, "cache.db"))
+        store.import_json_file(json_path)
+
+        hits = [f"app{random.randrange(args.entries)}-backend-beginner" for _ in range(args.ops)]
+        misses = [f"new{i}-ios-experienced" for i in range(args.ops)]
+        print(f"{args.entries} entries, {os.path.getsize(json_path) / 1e6:.1f} MB JSON file\n")
+
+        run("json hit", lambda k: json_request(json_path, k), hits)
+        run("json miss + write", lambda k: json_request(json_path, k), misses)
+
+        store._lru.clear()
+        run("store hit (cold LRU)", lambda k: store_request(store, k), hits)
+        run("store hit (warm LRU)", lambda k: store_request(store, k), hits)
+        run("store miss + upsert", lambda k: store_request(store, k), misses)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""End-to-end onboarding latency through /slack/events, with local fakes.
+
+Usage: python benchmarks/bench_e2e.py [--users 20] [--llm-latency 1.0] [--github-latency 0.1]
+
+Replays scripted conversations as signed Slack events against the FastAPI app.
+Slack, GitHub and Gemini are local stand-ins (benchmarks/fakes.py), so nothing
+leaves the machine. Reports p50/p95/p99 per flow, LLM and GitHub calls per
+completed onboarding, and throughput at N concurrent users.
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fakes import FakeGitHub, FakeGenerativeModel, FakeSlack
+
+SIGNING_SECRET = "bench-signing-secret"
+
+# (message, substring the bot's reply must contain for the turn to count as done)
+FLOWS = {
+    "quick": [
+        ("onboard me to {app} {team} as a new developer", "About"),
+        ("What environment variables do I need?", "ANSWER"),
+    ],
+    "guided": [
+        ("onboard me", "Which AppDev project"),
+        ("{app}", "Which team"),
+        ("{team}", "experience"),
+        ("I'm new", "About"),
+        ("How do I run the server?", "ANSWER"),
+    ],
+}
+APPS = ["eatery", "resell", "uplift", "score", "volume", "coursegrab"]
+TEAMS = ["backend", "ios", "android"]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def signed_headers(body: bytes) -> dict:
+    timestamp = str(int(time.time()))
+    base = f"v0:{timestamp}:{body.decode()}".encode()
+    signature = "v0=" + hmac.new(SIGNING_SECRET.encode(), base, hashlib.sha256).hexdigest()
+    return {"Content-Type": "application/json", "X-Slack-Request-Timestamp": timestamp,
+            "X-Slack-Signature": signature}
+
+
+async def run_user(client, slack, user_id: str, flow: list, app: str, team: str, results: dict):
+    channel = f"D{user_id}"
+    flow_start = time.perf_counter()
+    for i, (template, expect) in enumerate(flow):
+        text = template.format(app=app, team=team)
+        body = json.dumps({
+            "token": "x", "team_id": "T1", "api_app_id": "A1", "type": "event_callback",
+            "event_id": f"Ev{user_id}{i}", "event_time": int(time.time()),
+            "event": {"type": "message", "channel_type": "im", "user": user_id, "text": text,
+                      "channel": channel, "ts": f"{time.time():.6f}"},
+        }).encode()
+        sent = time.perf_counter()
+        response = await client.post("/slack/events", content=body, headers=signed_headers(body))
+        results["ack"].append(time.perf_counter() - sent)
+        if response.status_code != 200:
+            results["errors"] += 1
+            return
+        done = await asyncio.to_thread(slack.wait_for, channel, expect, sent)
+        if done is None:
+            results["errors"] += 1
+            return
+        if expect == "About":
+            results["onboarding"].append(done - sent)
+            results["completed"] += 1
+    results["flows"].append(time.perf_counter() - flow_start)
+
+
+async def run_flow(name: str, flow: list, args, slack, github, model) -> dict:
+    import httpx
+    import main
+
+    results = {"ack": [], "onboarding": [], "flows": [], "completed": 0, "errors": 0}
+    llm_before, gh_before = model.calls, github.calls
+    transport = httpx.ASGITransport(app=main.api)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            run_user(client, slack, f"U{name}{n}", flow, random.choice(APPS), random.choice(TEAMS), results)
+            for n in range(args.users)
+        ))
+        elapsed = time.perf_counter() - start
+    results["elapsed"] = elapsed
+    results["llm_calls"] = model.calls - llm_before
+    results["github_calls"] = github.calls - gh_before
+    return results
+
+
+def report(name: str, r: dict, users: int):
+    print(f"\n=== {name} flow, {users} concurrent users ===")
+    for label, values in (("ack", r["ack"]), ("guide visible", r["onboarding"]), ("whole flow", r["flows"])):
+        if values:
+            print(f"{label:<15} p50 {percentile(values, 50) * 1e3:8.1f} ms  p95 {percentile(values, 95) * 1e3:8.1f} ms  "
+                  f"p99 {percentile(values, 99) * 1e3:8.1f} ms  mean {statistics.mean(values) * 1e3:8.1f} ms")
+    completed = max(r["completed"], 1)
+    print(f"completed {r['completed']}/{users}, errors {r['errors']}")
+    print(f"LLM calls/onboarding {r['llm_calls'] / completed:.2f}   GitHub calls/onboarding {r['github_calls'] / completed:.2f}")
+    print(f"throughput {len(r['flows']) / r['elapsed']:.2f} flows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--flows", default="quick,guided")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="seconds to first token")
+    parser.add_argument("--llm-tokens", type=int, default=300)
+    parser.add_argument("--llm-tps", type=float, default=400.0, help="tokens per second")
+    parser.add_argument("--github-latency", type=float, default=0.1)
+    parser.add_argument("--slack-latency", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    github = FakeGitHub(latency=args.github_latency)
+    slack = FakeSlack(latency=args.slack_latency)
+    model = FakeGenerativeModel(args.llm_latency, args.llm_tokens, args.llm_tps)
+
+    tmp = tempfile.mkdtemp()
+    os.environ.update({
+        "GITHUB_API_URL": github.url,
+        "SLACK_API_URL": slack.url + "/api/",
+        "SLACK_BOT_TOKEN": "xoxb-bench",
+        "SLACK_SIGNING_SECRET": SIGNING_SECRET,
+        "CACHE_DB_PATH": os.path.join(tmp, "cache.db"),
+        "SLACK_STREAM_UPDATE_INTERVAL": "0.25",
+        # Measure the bot, not the production upstream budgets.
+        "GEMINI_BURST": "10000",
+        "GITHUB_BURST": "10000",
+    })
+    os.chdir(tmp)
+    import summarize_repo
+    summarize_repo.model = model
+
+    for name in args.flows.split(","):
+        results = asyncio.run(run_flow(name, FLOWS[name], args, slack, github, model))
+        report(name, results, args.users)
+    print(f"\nSlack API calls: {slack.calls}")
+
+
+if __name__ == "__main__":
+    main()
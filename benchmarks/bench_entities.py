@@ -0,0 +1,96 @@
+"""Accuracy and speed of entity extraction: old substring loops vs EntityExtractor.
+
+Usage: python benchmarks/bench_entities.py [--iterations 2000]
+
+Exits non-zero if the compiled extractor gets any labelled case wrong.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import ALLOWED_APPS, ALLOWED_TEAMS, EXPERIENCE_MAP
+from entities import Entities, extract_entities
+
+# (message, expected app, expected team, expected experience)
+CASES = [
+    ("onboard me to Resell Backend as a new developer", "resell", "backend", "beginner"),
+    ("help me start with Eatery iOS, I'm experienced", "eatery", "ios", "experienced"),
+    ("onboard me", None, None, None),
+    ("Resell", "resell", None, None),
+    ("Backend", None, "backend", None),
+    ("I'm new", None, None, "beginner"),
+    ("I'm returning to uplift android", "uplift", "android", "intermediate"),
+    ("get started with volume front-end", "volume", "frontend", None),
+    ("back end for coursegrab, some experience", "coursegrab", "backend", "intermediate"),
+    ("joining all-in as a designer", "all-in", "design", None),
+    ("eatery blue ios please", "eatery-blue", "ios", None),
+    ("ithaca transit android, veteran here", "ithaca-transit", "android", "experienced"),
+    ("podcast backend", "podcast", "backend", None),
+    ("pollo ios first time", "pollo", "ios", "beginner"),
+    ("I'm on andriod for uplfit", "uplift", "android", None),
+    ("marketing for hustle", "hustle", "marketing", None),
+    ("how do I check the scoreboard?", None, None, None),
+    ("what's in the news today", None, None, None),
+    ("can you renew the token", None, None, None),
+    ("score ios, no experience", "score", "ios", "beginner"),
+    ("my iOS build for navi fails", "navi", "ios", None),
+    ("scooped backend", "scooped", "backend", None),
+    ("what does the .env need for resell?", "resell", None, None),
+    # Inflected words must not fuzzy-match the app they start with.
+    ("onboard me, I scored well on the ios test", None, "ios", None),
+    ("get started with scores", None, None, None),
+    ("the app volumes are high", None, None, None),
+    ("I am a hustler", None, None, None),
+    ("I am feeling uplifted", None, None, None),
+]
+
+
+def legacy_extract(text: str) -> Entities:
+    text_lower = text.lower()
+    app = next((a for a in ALLOWED_APPS if a in text_lower), None)
+    team = next((t for t in ALLOWED_TEAMS if t in text_lower), None)
+    if team is None and ("back-end" in text_lower or "back end" in text_lower):
+        team = "backend"
+    if team is None and ("front-end" in text_lower or "front end" in text_lower):
+        team = "frontend"
+    experience = next((lvl for kw, lvl in EXPERIENCE_MAP.items() if kw in text_lower), None)
+    return Entities(app, team, experience)
+
+
+def score(fn) -> tuple[int, list]:
+    wrong = []
+    for text, *expected in CASES:
+        got = fn(text)
+        if tuple(got) != tuple(expected):
+            wrong.append((text, tuple(expected), tuple(got)))
+    return len(CASES) - len(wrong), wrong
+
+
+def timing(fn, iterations: int) -> float:
+    texts = [c[0] for c in CASES]
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for text in texts:
+            fn(text)
+    return (time.perf_counter() - start) / (iterations * len(texts)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    failed = False
+    for label, fn in (("legacy substring", legacy_extract), ("compiled extractor", extract_entities)):
+        correct, wrong = score(fn)
+        print(f"{label:<20} accuracy {correct}/{len(CASES)}  {timing(fn, args.iterations):6.1f} µs/message")
+        for text, expected, got in wrong:
+            print(f"    ✗ {text!r}: expected {expected}, got {got}")
+        failed = bool(wrong) and fn is extract_entities
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Hit rate, false-hit rate and latency of the follow-up answer cache.
+
+Usage: python benchmarks/bench_followup_cache.py [--questions 2000] [--llm-latency 2.0] [--thresholds 0.7,0.82,0.9]
+
+Replays a stream of paraphrased follow-up questions across several repos. A
+"false hit" is a cached answer served for a question from a different intent
+group. Expected latency assumes every miss costs one Gemini call of
+--llm-latency seconds.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from answer_cache import AnswerCache
+
+REPOS = [("resell", "backend"), ("eatery", "ios"), ("uplift", "android"), ("volume", "backend"), ("score", "ios")]
+INTENTS = {
+    "env": ["How do I get the .env?", "where do i get the .env file", "How do I get the env file?",
+            "Where can I find the .env?", "how do I get .env", "who gives me the .env file?"],
+    "figma": ["What's the Figma link?", "what is the figma link", "Where's the Figma?",
+              "Can you send the Figma link?", "figma link?", "link to the figma"],
+    "run": ["How do I run the server locally?", "how do i run the server", "How do I run it locally?",
+            "how to run the server locally", "How can I run the server on my machine?"],
+    "deps": ["Which dependencies do I need to install?", "what dependencies do I need",
+             "What do I need to install?", "which dependencies should I install first?"],
+    "tests": ["How do I run the tests?", "how to run tests", "How do I run the unit tests?",
+              "what command runs the tests"],
+    "db": ["How do I set up the database?", "how do i set up the database locally",
+           "What database do we use?", "how to set up the db"],
+}
+
+
+def workload(n: int, rng: random.Random) -> list[tuple]:
+    # Popular intents come up far more often, like real onboarding questions.
+    weights = [5, 3, 4, 2, 1, 1]
+    names = list(INTENTS)
+    return [(rng.choice(REPOS), intent, rng.choice(INTENTS[intent]))
+            for intent in rng.choices(names, weights, k=n)]
+
+
+def run(threshold: float, questions: list[tuple], llm_latency: float) -> dict:
+    cache = AnswerCache(threshold=threshold)
+    lookups, false_hits = [], 0
+    for repo, intent, question in questions:
+        key = (*repo, "readme-v1")
+        start = time.perf_counter()
+        answer = cache.get(key, question)
+        lookups.append(time.perf_counter() - start)
+        if answer is None:
+            cache.put(key, question, intent)
+        elif answer != intent:
+            false_hits += 1
+    stats = cache.stats()
+    misses = stats["misses"]
+    return {
+        "hit_rate": stats["hit_rate"],
+        "false_hits": false_hits,
+        "lookup_p50": statistics.median(lookups),
+        "lookup_p99": sorted(lookups)[int(0.99 * (len(lookups) - 1))],
+        "mean_latency": statistics.mean(lookups) + misses * llm_latency / len(questions),
+        "llm_calls": misses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=2000)
+    parser.add_argument("--llm-latency", type=float, default=2.0)
+    parser.add_argument("--thresholds", default="0.7,0.82,0.9")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    questions = workload(args.questions, random.Random(args.seed))
+    print(f"{args.questions} questions, {len(REPOS)} repos, {len(INTENTS)} intents, "
+          f"no-cache mean latency {args.llm_latency * 1e3:.0f} ms\n")
+    print(f"{'threshold':>9}  {'hit rate':>8}  {'false hits':>10}  {'LLM calls':>9}  "
+          f"{'lookup p50':>10}  {'lookup p99':>10}  {'mean latency':>12}")
+    for threshold in map(float, args.thresholds.split(",")):
+        r = run(threshold, questions, args.llm_latency)
+        print(f"{threshold:>9.2f}  {r['hit_rate']:>8.1%}  {r['false_hits']:>10}  {r['llm_calls']:>9}  "
+              f"{r['lookup_p50'] * 1e6:>8.1f}µs  {r['lookup_p99'] * 1e6:>8.1f}µs  {r['mean_latency'] * 1e3:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
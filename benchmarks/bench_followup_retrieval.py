@@ -0,0 +1,90 @@
+"""Prompt size (and optionally latency) of follow-ups with and without README retrieval.
+
+Usage:
+    python benchmarks/bench_followup_retrieval.py                 # fetch READMEs from GitHub
+    python benchmarks/bench_followup_retrieval.py --readme-dir d  # use local *.md files
+    python benchmarks/bench_followup_retrieval.py --live          # also time real Gemini calls
+
+Token counts are estimated at ~4 characters per token.
+"""
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from readme_index import get_index, retrieve_context
+
+REPOS = [("resell", "backend"), ("eatery", "ios"), ("uplift", "android"),
+         ("volume", "backend"), ("score", "ios"), ("coursegrab", "backend")]
+QUESTIONS = [
+    "What environment variables do I need?",
+    "How do I run the server locally?",
+    "Which dependencies do I need to install?",
+    "How do I run the tests?",
+    "Where do I get the .env file?",
+    "What's the Figma link?",
+]
+
+
+def load_readmes(args) -> dict:
+    if args.readme_dir:
+        return {os.path.basename(p): open(p).read() for p in glob.glob(os.path.join(args.readme_dir, "*.md"))}
+    from github_utils import fetch_readme
+    readmes = {}
+    for app, team in REPOS:
+        readme = fetch_readme(app, team)
+        if not readme.startswith("README not found"):
+            readmes[f"{app}-{team}"] = readme
+    return readmes
+
+
+def time_live(prompts: list[str]) -> float:
+    from summarize_repo import get_model
+    model = get_model()
+    latencies = []
+    for prompt in prompts:
+        start = time.perf_counter()
+        model.generate_content(prompt)
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--readme-dir")
+    parser.add_argument("--live", action="store_true")
+    args = parser.parse_args()
+
+    readmes = load_readmes(args)
+    if not readmes:
+        sys.exit("No READMEs found.")
+
+    print(f"{'repo':<22}{'chunks':>7}{'build ms':>10}{'search µs':>11}{'full tok':>10}{'ctx tok':>9}{'saved':>8}")
+    for name, readme in readmes.items():
+        start = time.perf_counter()
+        index = get_index(readme)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        contexts = [retrieve_context(readme, q) for q in QUESTIONS]
+        search = (time.perf_counter() - start) / len(QUESTIONS)
+
+        full_tokens = len(readme) / 4
+        ctx_tokens = statistics.mean(len(c) for c in contexts) / 4
+        print(f"{name:<22}{len(index.chunks):>7}{build * 1e3:>10.2f}{search * 1e6:>11.1f}"
+              f"{full_tokens:>10.0f}{ctx_tokens:>9.0f}{1 - ctx_tokens / full_tokens:>8.0%}")
+
+        if args.live:
+            from summarize_repo import build_followup_prompt
+            import readme_index
+            after = time_live([build_followup_prompt(q, name, "backend", readme) for q in QUESTIONS])
+            readme_index.FOLLOWUP_CONTEXT_CHARS = 10 ** 9
+            before = time_live([build_followup_prompt(q, name, "backend", readme) for q in QUESTIONS])
+            print(f"{'':<22}median Gemini latency: full README {before:.2f}s -> retrieved {after:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Golden-set check and speed comparison: legacy regex chain vs single-pass renderer.
+
+Usage: python benchmarks/bench_markdown.py [--size 200]
+
+Fails (exit 1) if markdown_to_mrkdwn disagrees with benchmarks/markdown_golden.json.
+For each golden case it also shows whether the legacy clean_markdown_artifacts
+produced the same output; where it doesn't, the golden output is the intended fix
+(links, headings, fenced code, stray bold markers).
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+from slack_format import markdown_to_mrkdwn
+
+
+# The regex chain clean_markdown_artifacts used before slack_format, kept for comparison.
+def legacy_clean_markdown_artifacts(text: str) -> str:
+    """Clean up markdown formatting for Slack compatibility and improve readability."""
+    code_blocks = []
+    def save_code(match):
+        code_blocks.append(match.group(0))
+        return f"___CODE_BLOCK_{len(code_blocks)-1}___"
+    
+    text = re.sub(r'`[^`]+`', save_code, text)
+    text = re.sub(r'\*\*([^\*]+?)\*\*', r'*\1*', text)
+    text = re.sub(r'\*\*\s+', ' ', text)
+    text = re.sub(r'\s+\*\*', ' ', text)
+    text = re.sub(r'\*\*', '', text)
+    text = re.sub(r' +', ' ', text)
+    text = re.sub(r'([^\n])\n(\*[📱🛠️🔑▶️📚🎨🔗👥])', r'\1\n\n\2', text)
+    text = re.sub(r'(\*[📱🛠️🔑▶️📚🎨🔗👥][^\n]+\*)\n([^\n])', r'\1\n\n\2', text)
+    text = re.sub(r'([^\n])\n(\d+\.)', r'\1\n\n\2', text)
+    text = re.sub(r'(\d+\.[^\n]+)\n([^\d\n•])', r'\1\n\n\2', text)
+    text = re.sub(r'([^\n•])\n(•)', r'\1\n\n\2', text)
+    text = re.sub(r'(•[^\n]+)\n([^\n•\d])', r'\1\n\n\2', text)
+    text = re.sub(r'([^\n`])\n(`[^`]+`)\n', r'\1\n\n\2\n\n', text)
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    for i, code in enumerate(code_blocks):
+        text = text.replace(f"___CODE_BLOCK_{i}___", code)
+    
+    return text.strip()
+
+
+def timing(fn, text: str, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=200, help="how many golden inputs to concatenate")
+    args = parser.parse_args()
+
+    with open(os.path.join(HERE, "markdown_golden.json")) as f:
+        golden = json.load(f)
+
+    failures = 0
+    for case in golden:
+        got = markdown_to_mrkdwn(case["input"])
+        legacy = legacy_clean_markdown_artifacts(case["input"])
+        ok = got == case["expected"]
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {case['name']:<22} legacy {'matches' if legacy == case['expected'] else 'differs'}")
+
+    big = "\n\n".join(case["input"] for case in golden) * max(args.size // len(golden), 1)
+    old, new = timing(legacy_clean_markdown_artifacts, big), timing(markdown_to_mrkdwn, big)
+    print(f"\n{len(big) / 1e3:.0f} KB input, {big.count('`') // 2} code spans")
+    print(f"legacy regex chain  {old * 1e3:8.2f} ms")
+    print(f"single-pass         {new * 1e3:8.2f} ms  ({old / new:.1f}x)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Planner prompt size and per-session memory over long conversations.
+
+Usage: python benchmarks/bench_planner_memory.py [--turns 500]
+
+Drives conversation_planner with a stand-in model that records every prompt,
+then compares the bounded memory against the old unbounded history list.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class _Response:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class RecordingModel:
+    """Returns a fixed no-op plan and remembers prompt sizes."""
+
+    def __init__(self):
+        self.prompt_chars = []
+
+    def generate_content(self, prompt: str):
+        self.prompt_chars.append(len(prompt))
+        reply = "Happy to help with that! " + "Here is some more detail about onboarding. " * 8
+        return _Response(json.dumps({"response": reply, "updates": {"action": "none"}}))
+
+
+def history_bytes(history) -> int:
+    size = sys.getsizeof(history) + sys.getsizeof(getattr(history, "summary", ""))
+    return size + sum(sys.getsizeof(t) + sys.getsizeof(t["user"]) + sys.getsizeof(t["bot"]) for t in history)
+
+
+def run_bounded(turns: int) -> dict:
+    from conversation import conversation_planner
+    model = RecordingModel()
+    state = {"phase": "done"}
+    latencies = []
+    for i in range(turns):
+        start = time.perf_counter()
+        conversation_planner(f"Thanks! Could you tell me more about step {i} of the process?", state, model)
+        latencies.append(time.perf_counter() - start)
+    return {"prompts": model.prompt_chars, "held": history_bytes(state["history"]), "latencies": latencies}
+
+
+def run_unbounded(turns: int) -> int:
+    """Memory held by the old append-forever history for the same conversation."""
+    history = []
+    for i in range(turns):
+        reply = "Happy to help with that! " + "Here is some more detail about onboarding. " * 8
+        history.append({"user": f"Thanks! Could you tell me more about step {i} of the process?", "bot": reply})
+    return history_bytes(history)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=500)
+    args = parser.parse_args()
+
+    result = run_bounded(args.turns)
+    prompts = result["prompts"]
+    marks = [m for m in (1, 10, 50, 100, 250, 500, 1000) if m <= len(prompts)]
+    print(f"{args.turns} planner turns\n")
+    print("prompt chars at turn " + ", ".join(f"{m}: {prompts[m - 1]}" for m in marks))
+    print(f"prompt chars  min {min(prompts)}  max {max(prompts)}  stdev {statistics.pstdev(prompts):.0f}")
+    print(f"planner overhead per turn  p50 {statistics.median(result['latencies']) * 1e6:.0f}µs")
+    print(f"history memory  bounded {result['held'] / 1024:.1f} KiB  "
+          f"unbounded list {run_unbounded(args.turns) / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Prompt tokens saved by README preprocessing, plus a setup-command regression check.
+
+Usage:
+    python benchmarks/bench_readme_prep.py                    # bundled samples in benchmarks/readme_samples
+    python benchmarks/bench_readme_prep.py --readme-dir d     # your own <app>-<team>.md files
+    python benchmarks/bench_readme_prep.py --github           # fetch the usual repos from GitHub
+    python benchmarks/bench_readme_prep.py --live             # also generate guides with Gemini
+
+Every shell command in a README's setup/run sections must survive preprocessing
+(and, with --live, appear in the generated guide); the script exits 1 if any
+is lost. Token counts are estimated at ~4 characters per token.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from readme_prep import CHARS_PER_TOKEN, prepare_readme, setup_commands, _prepared
+
+SAMPLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "readme_samples")
+REPOS = [("resell", "backend"), ("eatery", "ios"), ("uplift", "android"),
+         ("volume", "backend"), ("score", "ios"), ("coursegrab", "backend")]
+
+
+def load_readmes(args) -> dict:
+    """(app, team) -> README text."""
+    if args.github:
+        from github_utils import fetch_readme
+        readmes = {(app, team): fetch_readme(app, team) for app, team in REPOS}
+        return {k: v for k, v in readmes.items() if not v.startswith("README not found")}
+    readmes = {}
+    for path in sorted(glob.glob(os.path.join(args.readme_dir or SAMPLES, "*.md"))):
+        app, _, team = os.path.basename(path)[:-3].rpartition("-")
+        with open(path) as f:
+            readmes[(app, team)] = f.read()
+    return readmes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--readme-dir")
+    parser.add_argument("--github", action="store_true")
+    parser.add_argument("--budget", type=int, help="token budget (default README_PROMPT_TOKENS)")
+    parser.add_argument("--live", action="store_true")
+    args = parser.parse_args()
+
+    readmes = load_readmes(args)
+    failures = []
+    total_raw = total_kept = 0
+    print(f"{'readme':<22} {'raw tok':>8} {'kept tok':>8} {'saved':>6} {'cold ms':>8} {'warm µs':>8} {'commands':>9}")
+    for (app, team), readme in readmes.items():
+        _prepared.clear()
+        start = time.perf_counter()
+        prepared = prepare_readme(readme, team, args.budget)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        prepare_readme(readme, team, args.budget)
+        warm = time.perf_counter() - start
+
+        commands = setup_commands(readme)
+        lost = [c for c in commands if c not in prepared]
+        failures += [(f"{app}-{team}", "prep", c) for c in lost]
+        raw, kept = len(readme) // CHARS_PER_TOKEN, len(prepared) // CHARS_PER_TOKEN
+        total_raw, total_kept = total_raw + raw, total_kept + kept
+        print(f"{app + '-' + team:<22} {raw:>8} {kept:>8} {1 - kept / max(raw, 1):>6.0%} {cold * 1e3:>8.2f} "
+              f"{warm * 1e6:>8.1f} {len(commands) - len(lost):>4}/{len(commands):<4}")
+
+        if args.live:
+            from summarize_repo import build_summary_prompt, _generate_text
+            guide = _generate_text(build_summary_prompt(app, team, "beginner", readme))
+            failures += [(f"{app}-{team}", "guide", c) for c in commands if c not in guide]
+
+    print(f"\ntotal {total_raw} -> {total_kept} tokens ({1 - total_kept / max(total_raw, 1):.0%} saved)")
+    for name, stage, command in failures:
+        print(f"❌ {name}: `{command}` missing from {stage}")
+    if failures:
+        sys.exit(1)
+    print("✅ every setup command survived")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Repo facts against the local GitHub stand-in: cold/cached latency plus correctness checks.
+
+Usage: python benchmarks/bench_repo_facts.py [--github-latency 0.05] [--tarball-latency 0.2]
+
+Checks that a sample tarball parses into the expected commands/env vars, that
+facts are cached by SHA (one tarball download per repo), and that a download
+slower than REPO_FACTS_TIMEOUT falls back to "" without delaying the caller
+while the background fetch still fills the cache. Exits 1 on any failure.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fakes import FakeGitHub, fake_tarball
+
+EXPECTED = ["`npm install`", "`npm run dev`", "DATABASE_URL", "JWT_SECRET", "node >=18", "db"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--github-latency", type=float, default=0.05)
+    parser.add_argument("--tarball-latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    github = FakeGitHub(latency=args.github_latency, tarball_latency=args.tarball_latency)
+    tmp = tempfile.mkdtemp()
+    os.environ.update({"GITHUB_API_URL": github.url, "CACHE_DB_PATH": os.path.join(tmp, "cache.db"),
+                       "GITHUB_BURST": "10000"})
+    os.chdir(tmp)
+    from repo_facts import REPO_FACTS_TIMEOUT, extract_facts, format_facts, prefetch_facts, \
+        repo_facts_context, wait_for_facts, _tarball_files
+    failures = []
+
+    block = format_facts(extract_facts(_tarball_files(fake_tarball("resell-backend", "abc1234"))))
+    failures += [f"sample tarball: {want!r} missing from facts" for want in EXPECTED if want not in block]
+
+    start = time.perf_counter()
+    cold = repo_facts_context("resell", "backend")
+    cold_s = time.perf_counter() - start
+    start = time.perf_counter()
+    cached = repo_facts_context("resell", "backend")
+    cached_s = time.perf_counter() - start
+    print(f"cold   {cold_s * 1e3:8.1f} ms  (HEAD + tarball download + parse)")
+    print(f"cached {cached_s * 1e3:8.1f} ms  (HEAD SHA cached)")
+    if not cold or cold != cached:
+        failures.append("live fetch: facts missing or differ between cold and cached calls")
+    if github.tarballs != 1:
+        failures.append(f"live fetch: expected 1 tarball download, got {github.tarballs}")
+
+    # A download slower than the grace period: the caller gets "" on time, the cache fills later.
+    github.tarball_latency = REPO_FACTS_TIMEOUT * 4
+    future = prefetch_facts("eatery", "backend")
+    start = time.perf_counter()
+    fallback = wait_for_facts(future)
+    waited = time.perf_counter() - start
+    print(f"slow   {waited * 1e3:8.1f} ms  wait with a {github.tarball_latency:.1f}s download "
+          f"(REPO_FACTS_TIMEOUT {REPO_FACTS_TIMEOUT}s)")
+    if fallback or waited > REPO_FACTS_TIMEOUT + 0.2:
+        failures.append(f"timeout fallback: got {len(fallback)} chars after {waited:.2f}s")
+    if not future.result(timeout=30) or not repo_facts_context("eatery", "backend"):
+        failures.append("timeout fallback: background fetch didn't fill the cache")
+    if github.tarballs != 2:
+        failures.append(f"timeout fallback: expected 2 tarball downloads in total, got {github.tarballs}")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ facts parsed, cached by SHA, and slow downloads don't hold up guides")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Memory under a synthetic 10k-user load: plain dict sessions vs SessionStore.
+
+Usage: python benchmarks/bench_sessions.py [--users 10000] [--waves 5] [--max-sessions 2000]
+
+Every user is onboarded to one of a few repos (so READMEs repeat) and asks a
+handful of follow-ups. Each wave brings in a fresh set of users, the way
+cohorts arrive; the dict grows forever while the store stays bounded.
+"""
+import argparse
+import os
+import random
+import resource
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from session_store import SessionStore, SessionState
+
+REPOS = [f"repo{i}" for i in range(20)]
+
+
+def make_readme(name: str) -> str:
+    # Fresh string per fetch, as fetch_readme decodes a new copy every call.
+    return f"# {name}\n" + "Setup instructions and lots of prose. " * 600
+
+
+def onboard(states, user_id, factory):
+    repo = random.choice(REPOS)
+    state = factory(app=repo, team="backend", experience="beginner", phase="onboarded")
+    state["readme"] = make_readme(repo)
+    state["history"] = [{"user": f"question {i}?", "bot": "answer " * 40} for i in range(5)]
+    states[user_id] = state
+
+
+def run(label, states, factory, users, waves, stats=None):
+    tracemalloc.start()
+    for wave in range(waves):
+        for i in range(users // waves):
+            onboard(states, f"U{wave}-{i}", factory)
+        current, _ = tracemalloc.get_traced_memory()
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        extra = f"  {stats()}" if stats else ""
+        print(f"{label:<14} wave {wave + 1}: {len(states):>6} sessions  traced {current / 1e6:>7.1f} MB  "
+              f"max RSS {rss:>7.1f} MB{extra}")
+    tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--waves", type=int, default=5)
+    parser.add_argument("--max-sessions", type=int, default=2_000)
+    args = parser.parse_args()
+
+    store = SessionStore(max_sessions=args.max_sessions)
+    run("SessionStore", store, SessionState, args.users, args.waves,
+        stats=lambda: {k: v for k, v in store.memory_stats().items() if k in ("readmes", "evicted")})
+    run("dict", {}, dict, args.users, args.waves)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Cold-start cost of the bot: `import main` and time to the first handled Slack event.
+
+Usage: python benchmarks/bench_startup.py [--runs 5] [--warm]
+
+Each run is a fresh interpreter (as on a new autoscaled instance) talking to
+the local Slack/GitHub stand-ins from benchmarks/fakes.py. Reported per run:
+  import      time to `import main`
+  first ack   HTTP response to the first signed event (Slack's 3s deadline)
+  first reply first bot message for "onboard me"
+  first guide first generated guide (a fresh user, fake Gemini)
+--warm runs main.warm_up() (the WARM_ON_STARTUP hook) before the first event,
+so its cost shows up under "warm-up" instead of inside the first requests.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH = os.path.dirname(os.path.abspath(__file__))
+STAGES = ("import", "warm-up", "first ack", "first reply", "first guide")
+
+
+async def send_event(client, slack, user_id: str, text: str, expect: str) -> tuple[float, float]:
+    from bench_e2e import signed_headers
+    body = json.dumps({
+        "token": "x", "team_id": "T1", "api_app_id": "A1", "type": "event_callback",
+        "event_id": f"Ev{user_id}", "event_time": int(time.time()),
+        "event": {"type": "message", "channel_type": "im", "user": user_id, "text": text,
+                  "channel": f"D{user_id}", "ts": f"{time.time():.6f}"},
+    }).encode()
+    sent = time.perf_counter()
+    response = await client.post("/slack/events", content=body, headers=signed_headers(body))
+    acked = time.perf_counter() - sent
+    done = await asyncio.to_thread(slack.wait_for, f"D{user_id}", expect, sent, 30.0)
+    if response.status_code != 200 or done is None:
+        raise RuntimeError(f"no {expect!r} reply to {text!r}")
+    return acked, done - sent
+
+
+def child(warm: bool):
+    """One cold start; prints its timings as JSON."""
+    sys.path.insert(0, ROOT)
+    sys.path.insert(0, BENCH)
+    from fakes import FakeGitHub, FakeGenerativeModel, FakeSlack
+    from bench_e2e import SIGNING_SECRET
+
+    github, slack = FakeGitHub(latency=0.05), FakeSlack(latency=0.01)
+    tmp = tempfile.mkdtemp()
+    os.environ.update({
+        "GITHUB_API_URL": github.url,
+        "SLACK_API_URL": slack.url + "/api/",
+        "SLACK_BOT_TOKEN": "xoxb-bench",
+        "SLACK_SIGNING_SECRET": SIGNING_SECRET,
+        "CACHE_DB_PATH": os.path.join(tmp, "cache.db"),
+    })
+    os.chdir(tmp)
+
+    timings = {}
+    start = time.perf_counter()
+    import main
+    timings["import"] = time.perf_counter() - start
+    if warm:
+        start = time.perf_counter()
+        main.warm_up()
+        timings["warm-up"] = time.perf_counter() - start
+    import summarize_repo
+    summarize_repo.model = FakeGenerativeModel(latency=0.2, tokens=200)
+
+    async def run():
+        import httpx
+        transport = httpx.ASGITransport(app=main.api)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            timings["first ack"], timings["first reply"] = await send_event(
+                client, slack, "U1", "onboard me", "Which AppDev project")
+            _, timings["first guide"] = await send_event(
+                client, slack, "U2", "onboard me to eatery backend as a new developer", "About")
+
+    asyncio.run(run())
+    main.shutdown_background_work()
+    print(json.dumps(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warm", action="store_true", help="run the warm-up hook before the first event")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args.warm)
+
+    runs = []
+    for _ in range(args.runs):
+        cmd = [sys.executable, os.path.abspath(__file__), "--child"] + (["--warm"] if args.warm else [])
+        out = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+        if out.returncode != 0:
+            sys.exit(f"❌ run failed:\n{out.stderr[-2000:]}")
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f"=== cold start, {args.runs} runs{' (warm-up hook)' if args.warm else ''} ===")
+    for stage in STAGES:
+        values = [r[stage] for r in runs if stage in r]
+        if values:
+            print(f"{stage:<12} median {statistics.median(values) * 1e3:8.1f} ms  max {max(values) * 1e3:8.1f} ms")
+    to_reply = [r["import"] + r.get("warm-up", 0) + r["first reply"] for r in runs]
+    print(f"{'import→reply':<12} median {statistics.median(to_reply) * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
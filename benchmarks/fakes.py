@@ -0,0 +1,238 @@
+"""Local stand-ins for GitHub, Slack and Gemini used by the end-to-end benchmarks."""
+import base64
+import hashlib
+import io
+import json
+import tarfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+CANNED_SUMMARY = """**📱 About {app}**
+A Cornell AppDev app used by thousands of students.
+
+**🛠️ Setup Instructions**
+1. Clone the repo and run `npm install`
+2. Copy `.env.example` to `.env`
+3. Run `npm run dev`
+
+**🔑 Required Configuration**
+• `DATABASE_URL` — ask your team lead
+
+**▶️ Running the Project**
+• `npm run dev` then open http://localhost:3000
+"""
+CANNED_ANSWER = "ANSWER: set `DATABASE_URL` in `.env` and run `npm run dev`."
+FAKE_README = "# {repo}\n\n## Setup\nRun `npm install`.\n\n## Environment\nSet DATABASE_URL.\n" + "Prose. " * 400
+FAKE_REPO_FILES = {
+    "package.json": json.dumps({"scripts": {"dev": "node server.js", "test": "jest"},
+                                "engines": {"node": ">=18"}, "dependencies": {"express": "^4", "pg": "^8"}}),
+    ".env.example": "DATABASE_URL=postgres://localhost/{repo}\nJWT_SECRET=\n",
+    "docker-compose.yml": "services:\n  db:\n    image: postgres\n",
+    "src/index.js": "console.log('not a manifest')\n",
+}
+
+
+def fake_tarball(repo: str, sha: str, files: dict = None) -> bytes:
+    """A GitHub-style repo tarball: every path under a single <owner>-<repo>-<sha> directory."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        for path, text in (files or FAKE_REPO_FILES).items():
+            data = text.replace("{repo}", repo).encode()
+            info = tarfile.TarInfo(f"cuappdev-{repo}-{sha[:7]}/{path}")
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+class _Server:
+    def __init__(self, handler_cls):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler_cls)
+        self.httpd.daemon_threads = True
+        self.httpd.fake = self
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def close(self):
+        self.httpd.shutdown()
+
+
+class _QuietHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, status: int, payload=None, headers=None):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_bytes(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeGitHub(_Server):
+    """Serves /repos/<owner>/<repo>/readme with ETags after a configurable delay,
+    plus /commits/HEAD (as a bare SHA) and /tarball/<sha> for repo facts.
+
+    Repos ending in a name from `missing` return 404, like guessed repos that
+    don't exist. `tarball_latency` is extra delay on tarball downloads.
+    """
+
+    def __init__(self, latency: float = 0.1, missing: tuple = (), tarball_latency: float = 0.0):
+        self.latency = latency
+        self.missing = missing
+        self.tarball_latency = tarball_latency
+        self.calls = 0
+        self.tarballs = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        super().__init__(_GitHubHandler)
+
+
+class _GitHubHandler(_QuietHandler):
+    def do_GET(self):
+        fake = self.server.fake
+        with fake._lock:
+            fake.calls += 1
+        time.sleep(fake.latency)
+        parts = self.path.strip("/").split("/")
+        if len(parts) < 4 or parts[0] != "repos" or parts[2].endswith(fake.missing) or parts[2].count("-") == 0:
+            return self._send_json(404, {"message": "Not Found"})
+        sha = hashlib.sha1(parts[2].encode()).hexdigest()
+        if parts[3:] == ["commits", "HEAD"]:
+            return self._send_bytes(200, sha.encode(), "application/vnd.github.sha")
+        if parts[3] == "tarball" and parts[4:] == [sha]:
+            with fake._lock:
+                fake.tarballs += 1
+            time.sleep(fake.tarball_latency)
+            return self._send_bytes(200, fake_tarball(parts[2], sha), "application/x-gzip")
+        if parts[3:] != ["readme"]:
+            return self._send_json(404, {"message": "Not Found"})
+        content = FAKE_README.format(repo=parts[2])
+        etag = '"' + hashlib.md5(content.encode()).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            with fake._lock:
+                fake.not_modified += 1
+            return self._send_json(304, headers={"ETag": etag})
+        self._send_json(200, {"content": base64.b64encode(content.encode()).decode()}, {"ETag": etag})
+
+
+class FakeSlack(_Server):
+    """Minimal Slack Web API: auth.test, chat.postMessage and chat.update.
+
+    Every message text is recorded per channel so callers can wait for a reply.
+    """
+
+    def __init__(self, latency: float = 0.02):
+        self.latency = latency
+        self.calls = {}
+        self.messages = {}
+        self._ts = 0
+        self._cond = threading.Condition()
+        super().__init__(_SlackHandler)
+
+    def record(self, method: str, channel: str, text: str) -> str:
+        with self._cond:
+            self.calls[method] = self.calls.get(method, 0) + 1
+            self._ts += 1
+            self.messages.setdefault(channel, []).append((time.perf_counter(), text))
+            self._cond.notify_all()
+            return f"{int(time.time())}.{self._ts:06d}"
+
+    def wait_for(self, channel: str, substring: str, since: float, timeout: float = 60.0) -> float | None:
+        """Returns the time the first matching message arrived after `since`."""
+        deadline = time.perf_counter() + timeout
+        with self._cond:
+            while True:
+                for at, text in self.messages.get(channel, []):
+                    if at >= since and substring in text:
+                        return at
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+
+class _SlackHandler(_QuietHandler):
+    def do_POST(self):
+        fake = self.server.fake
+        time.sleep(fake.latency)
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length).decode()
+        if "json" in self.headers.get("Content-Type", ""):
+            params = json.loads(raw or "{}")
+        else:
+            params = {k: v[0] for k, v in parse_qs(raw).items()}
+        method = self.path.rsplit("/", 1)[-1]
+        if method == "auth.test":
+            return self._send_json(200, {"ok": True, "user_id": "UBOT", "bot_id": "BBOT",
+                                         "team_id": "T1", "user": "onboarding-bot"})
+        channel = params.get("channel", "")
+        ts = fake.record(method, channel, params.get("text", ""))
+        self._send_json(200, {"ok": True, "channel": channel, "ts": params.get("ts", ts)})
+
+
+class _Chunk:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """Drop-in for genai.GenerativeModel that returns canned text.
+
+    `latency` is time to first token; tokens then arrive at `tokens_per_second`.
+    """
+
+    def __init__(self, latency: float = 1.0, tokens: int = 300, tokens_per_second: float = 400.0):
+        self.latency = latency
+        self.tokens = tokens
+        self.tokens_per_second = tokens_per_second
+        self.calls = 0
+        self.prompt_chars = 0
+        self._lock = threading.Lock()
+
+    def _text(self, prompt: str) -> str:
+        if "The user is joining the" in prompt:
+            app = prompt.split("joining the ", 1)[1].split(" ", 1)[0]
+            base = CANNED_SUMMARY.format(app=app.title())
+        else:
+            base = CANNED_ANSWER
+        filler = max(self.tokens - len(base.split()), 0)
+        return base + ("\n\nMore detail. " + "word " * filler if filler else "")
+
+    def _pieces(self, text: str) -> list[str]:
+        words = text.split(" ")
+        return [w + " " for w in words[:-1]] + [words[-1]]
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        with self._lock:
+            self.calls += 1
+            self.prompt_chars += len(prompt)
+        text = self._text(prompt)
+        time.sleep(self.latency)
+        if not stream:
+            time.sleep(self.tokens / self.tokens_per_second)
+            return _Chunk(text)
+        return self._stream(text)
+
+    def _stream(self, text: str):
+        pieces = self._pieces(text)
+        per_chunk = 20
+        for i in range(0, len(pieces), per_chunk):
+            time.sleep(per_chunk / self.tokens_per_second)
+            yield _Chunk("".join(pieces[i:i + per_chunk]))
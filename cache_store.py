@@ -0,0 +1,201 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import cache_requests
+
+CACHE_DB_FILE = os.getenv("CACHE_DB_PATH", "cache.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    namespace  TEXT NOT NULL,
+    key        TEXT NOT NULL,
+    value      TEXT NOT NULL,
+    expires_at REAL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+)
+"""
+
+_MISSING = object()
+
+
+class CacheStore:
+    """Key/value cache: an in-process LRU in front of a shared SQLite (WAL) table.
+
+    Every uvicorn worker opens the same database file, so entries written by one
+    worker are visible to the others. Writes are single-row upserts, never a
+    rewrite of the whole cache. Entries may carry a TTL; expired rows are
+    treated as missing and purged lazily.
+
+    Nothing touches the database until the first read or write, so creating a
+    store at import time is free; `seed_file` (an old JSON cache) is imported then.
+    """
+
+    def __init__(self, namespace: str, path: str = None, default_ttl: float | None = None,
+                 lru_size: int = 1024, lru_ttl: float = 60.0, seed_file: str = None):
+        self.namespace = namespace
+        self.path = path or CACHE_DB_FILE
+        self.default_ttl = default_ttl
+        self.lru_size = lru_size
+        # How long a value may be served from this process's LRU before we
+        # re-read SQLite, which bounds staleness against other workers.
+        self.lru_ttl = lru_ttl
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.seed_file = seed_file
+        self._ready = False
+        self._ready_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        if not self._ready:
+            self._initialize(conn)
+        return conn
+
+    def warm(self):
+        """Opens the database (and imports `seed_file`) now rather than on first use."""
+        self._connect()
+
+    def _initialize(self, conn: sqlite3.Connection):
+        with self._ready_lock:
+            if self._ready:
+                return
+            conn.execute(_SCHEMA)
+            self._ready = True
+        if self.seed_file:
+            self.import_json_file(self.seed_file)
+
+    def _remember(self, key, value, expires_at):
+        local_expiry = time.time() + self.lru_ttl
+        if expires_at is not None:
+            local_expiry = min(local_expiry, expires_at)
+        with self._lock:
+            self._lru[key] = (value, local_expiry)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+
+    def _forget(self, key):
+        with self._lock:
+            self._lru.pop(key, None)
+
+    def get(self, key: str, default=None):
+        now = time.time()
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._lru.move_to_end(key)
+                    cache_requests.inc(cache=self.namespace, result="hit")
+                    return entry[0]
+                del self._lru[key]
+
+        row = self._connect().execute(
+            "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+            (self.namespace, key),
+        ).fetchone()
+        if row is None:
+            cache_requests.inc(cache=self.namespace, result="miss")
+            return default
+        value, expires_at = row
+        if expires_at is not None and expires_at <= now:
+            self.delete(key)
+            cache_requests.inc(cache=self.namespace, result="miss")
+            return default
+        cache_requests.inc(cache=self.namespace, result="hit")
+        value = json.loads(value)
+        self._remember(key, value, expires_at)
+        return value
+
+    def set(self, key: str, value, ttl: float | None = _MISSING):
+        """Atomically inserts or replaces an entry. ttl=None stores it without expiry."""
+        if ttl is _MISSING:
+            ttl = self.default_ttl
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        self._connect().execute(
+            "INSERT INTO cache (namespace, key, value, expires_at, updated_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(namespace, key) DO UPDATE SET "
+            "value = excluded.value, expires_at = excluded.expires_at, updated_at = excluded.updated_at",
+            (self.namespace, key, json.dumps(value), expires_at, now),
+        )
+        self._remember(key, value, expires_at)
+
+    def add(self, key: str, value, ttl: float | None = _MISSING) -> bool:
+        """Stores the entry only if the key is absent or expired. Atomic across processes.
+
+        Returns True if this call stored it, False if a live entry already existed.
+        """
+        if ttl is _MISSING:
+            ttl = self.default_ttl
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        cursor = self._connect().execute(
+            "INSERT INTO cache (namespace, key, value, expires_at, updated_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(namespace, key) DO UPDATE SET "
+            "value = excluded.value, expires_at = excluded.expires_at, updated_at = excluded.updated_at "
+            "WHERE cache.expires_at IS NOT NULL AND cache.expires_at <= ?",
+            (self.namespace, key, json.dumps(value), expires_at, now, now),
+        )
+        if cursor.rowcount != 1:
+            return False
+        self._remember(key, value, expires_at)
+        return True
+
+    def delete(self, key: str):
+        self._forget(key)
+        self._connect().execute(
+            "DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key)
+        )
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def keys(self, prefix: str = "") -> list[str]:
+        rows = self._connect().execute(
+            "SELECT key FROM cache WHERE namespace = ? AND key >= ? AND key < ? "
+            "AND (expires_at IS NULL OR expires_at > ?)",
+            (self.namespace, prefix, prefix + "\uffff", time.time()),
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    def purge_expired(self) -> int:
+        cursor = self._connect().execute(
+            "DELETE FROM cache WHERE namespace = ? AND expires_at IS NOT NULL AND expires_at <= ?",
+            (self.namespace, time.time()),
+        )
+        return cursor.rowcount
+
+    def import_json_file(self, path: str) -> int:
+        """One-time migration from the old whole-file JSON caches."""
+        if not os.path.exists(path) or self.keys():
+            return 0
+        with open(path, "r") as f:
+            data = json.load(f)
+        conn = self._connect()
+        now = time.time()
+        expires_at = now + self.default_ttl if self.default_ttl else None
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT OR IGNORE INTO cache (namespace, key, value, expires_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(self.namespace, k, json.dumps(v), expires_at, now) for k, v in data.items()],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        print(f"📦 Imported {len(data)} entries from {path} into {self.namespace} cache")
+        return len(data)
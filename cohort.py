@@ -0,0 +1,250 @@
+"""Bulk onboarding for a whole cohort: one generation per unique guide, then rate-limited DMs.
+
+Usage:
+    python cohort.py roster.csv --dry-run                        # validate + show grouping
+    python cohort.py roster.csv --url http://localhost:3000       # run via the server (needs ADMIN_TOKEN)
+
+The roster is a CSV with columns user,app,team,experience (user is a Slack user
+ID). The run itself happens inside the bot process (POST /admin/cohort) so the
+seeded sessions are the ones live follow-ups will see.
+"""
+import argparse
+import csv
+import io
+import itertools
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from config import ALLOWED_APPS, ALLOWED_TEAMS, EXPERIENCE_LEVELS, EXPERIENCE_MAP, NEXT_STEPS, TECH_TEAMS
+from entities import extract_entities
+from rate_limit import scheduler, priority, BACKGROUND
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+COHORT_GENERATION_CONCURRENCY = int(os.getenv("COHORT_GENERATION_CONCURRENCY", 4))
+COHORT_SEND_CONCURRENCY = int(os.getenv("COHORT_SEND_CONCURRENCY", 8))
+
+# chat.postMessage allows short bursts but roughly one message per second per
+# workspace sustained; override if Slack grants the app more.
+scheduler.configure("slack_post", rate=float(os.getenv("SLACK_POST_RPM", 60)) / 60,
+                    burst=float(os.getenv("SLACK_POST_BURST", 10)))
+
+
+class RosterRow(NamedTuple):
+    user: str
+    app: str
+    team: str
+    experience: str
+
+
+def _normalize_experience(value: str) -> str | None:
+    value = value.strip().lower()
+    if value in EXPERIENCE_LEVELS:
+        return value
+    return EXPERIENCE_MAP.get(value) or extract_entities(value).experience
+
+
+def parse_roster(rows) -> tuple[list[RosterRow], list[dict]]:
+    """Validates raw roster rows (dicts or CSV text); returns (rows, rejected)."""
+    if isinstance(rows, str):
+        rows = list(csv.DictReader(io.StringIO(rows.strip())))
+    valid, rejected, seen = [], [], set()
+    for raw in rows:
+        if not isinstance(raw, dict):
+            rejected.append({"user": "", "error": f"row is not an object: {raw!r}"})
+            continue
+        raw = {str(k).strip().lower(): "" if v is None else str(v).strip()
+               for k, v in raw.items() if k and not isinstance(v, (list, dict))}
+        user = raw.get("user", "")
+        app = raw.get("app", "").lower()
+        app = app if app in ALLOWED_APPS else extract_entities(app).app
+        team = raw.get("team", "").lower()
+        team = team if team in ALLOWED_TEAMS else extract_entities(team).team
+        experience = _normalize_experience(raw.get("experience", "") or "beginner")
+        error = ("missing user" if not user else
+                 "duplicate user" if user in seen else
+                 f"unknown app {raw.get('app')!r}" if not app else
+                 f"unknown team {raw.get('team')!r}" if not team else
+                 f"unknown experience {raw.get('experience')!r}" if not experience else None)
+        if error:
+            rejected.append({"user": user, "error": error})
+            continue
+        seen.add(user)
+        valid.append(RosterRow(user, app, team, experience))
+    return valid, rejected
+
+
+def group_rows(rows: list[RosterRow]) -> dict[tuple, list[str]]:
+    """(app, team, experience) -> users needing that guide."""
+    groups = {}
+    for row in rows:
+        groups.setdefault((row.app, row.team, row.experience), []).append(row.user)
+    return groups
+
+
+def _slack_rate_limited(error: Exception) -> bool:
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None) == 429
+
+
+def _generate(combo: tuple) -> tuple[str, str]:
+    from github_utils import fetch_readme
+    from summarize_repo import generate_summary
+    app, team, experience = combo
+    # Live users asking the bot directly go ahead of the cohort's generations.
+    with priority(BACKGROUND):
+        readme = fetch_readme(app, team)
+        summary = generate_summary(app, team, experience)
+    return readme, summary
+
+
+def _welcome(app: str, team: str, experience: str, summary: str) -> str:
+    text = (f"👋 Welcome to *{app.title()} {team.title()}*! Here's your onboarding guide "
+            f"as a *{experience}* member.\n\n{summary}")
+    return f"{text}\n\n{NEXT_STEPS}" if team in TECH_TEAMS else text
+
+
+def run_cohort(rows: list[RosterRow], client, sessions, progress=None) -> dict:
+    """Generates each unique guide once, DMs every member, and seeds their sessions.
+
+    `client` is a slack_sdk WebClient and `sessions` the bot's SessionStore.
+    Returns a report with per-member delivery latency and every failure.
+    """
+    from session_store import SessionState
+    start = time.perf_counter()
+    groups = group_rows(rows)
+    guides, failures = {}, []
+
+    def generate(combo):
+        gen_start = time.perf_counter()
+        try:
+            guides[combo] = _generate(combo)
+            print(f"📝 Guide ready for {'-'.join(combo)} ({time.perf_counter() - gen_start:.1f}s)")
+        except Exception as e:
+            failures.extend({"user": user, "error": f"generation failed: {e}"} for user in groups[combo])
+
+    with ThreadPoolExecutor(max_workers=COHORT_GENERATION_CONCURRENCY) as pool:
+        list(pool.map(generate, groups))
+
+    latencies = []
+    lock = threading.Lock()
+
+    def send(job):
+        (app, team, experience), user = job
+        readme, summary = guides[(app, team, experience)]
+        try:
+            scheduler.call("slack_post", client.chat_postMessage, channel=user,
+                           text=_welcome(app, team, experience, summary),
+                           is_rate_limited=_slack_rate_limited)
+        except Exception as e:
+            with lock:
+                failures.append({"user": user, "error": f"DM failed: {e}"})
+            return
+        state = sessions.get(user) or SessionState()
+        state.update({"app": app, "team": team, "experience": experience, "phase": "onboarded", "readme": readme})
+        sessions[user] = state
+        with lock:
+            latencies.append(time.perf_counter() - start)
+            if progress:
+                progress(len(latencies))
+
+    jobs = [(combo, user) for combo, users in groups.items() if combo in guides for user in users]
+    with ThreadPoolExecutor(max_workers=COHORT_SEND_CONCURRENCY) as pool:
+        list(pool.map(send, jobs))
+
+    ordered = sorted(latencies)
+    return {
+        "members": len(rows),
+        "guides": len(groups),
+        "guides_generated": len(guides),
+        "delivered": len(latencies),
+        "failed": len(failures),
+        "failures": failures,
+        "elapsed_s": round(time.perf_counter() - start, 2),
+        "delivery_latency_s": {
+            "p50": round(statistics.median(ordered), 2),
+            "p95": round(ordered[int(0.95 * (len(ordered) - 1))], 2),
+            "max": round(ordered[-1], 2),
+        } if ordered else None,
+    }
+
+
+class CohortJobs:
+    """Runs cohort onboardings in the background and keeps their reports."""
+
+    def __init__(self):
+        self._jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def start(self, rows: list[RosterRow], rejected: list[dict], client, sessions) -> str:
+        job_id = str(next(self._ids))
+        job = {"id": job_id, "status": "running", "members": len(rows), "delivered": 0}
+        with self._lock:
+            self._jobs[job_id] = job
+
+        def progress(delivered):
+            job["delivered"] = delivered
+
+        def run():
+            try:
+                job.update(run_cohort(rows, client, sessions, progress), status="done")
+            except Exception as e:
+                job.update(status="failed", error=str(e))
+            job["failures"] = job.get("failures", []) + rejected
+            job["failed"] = len(job["failures"])
+            print(f"👥 Cohort {job_id} {job['status']}: {job['delivered']}/{job['members']} delivered")
+
+        threading.Thread(target=run, name=f"cohort-{job_id}", daemon=True).start()
+        return job_id
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("roster", help="CSV with columns user,app,team,experience")
+    parser.add_argument("--url", default="http://localhost:3000", help="bot server base URL")
+    parser.add_argument("--dry-run", action="store_true", help="validate and group only")
+    args = parser.parse_args()
+
+    with open(args.roster) as f:
+        text = f.read()
+    rows, rejected = parse_roster(text)
+    groups = group_rows(rows)
+    print(f"👥 {len(rows)} members, {len(groups)} unique guides, {len(rejected)} rejected")
+    for combo, users in sorted(groups.items(), key=lambda kv: -len(kv[1])):
+        print(f"  • {'-'.join(combo)}: {len(users)}")
+    for row in rejected:
+        print(f"  ❌ {row['user'] or '(blank)'}: {row['error']}")
+    if args.dry_run:
+        return
+
+    import httpx
+    headers = {"Authorization": f"Bearer {ADMIN_TOKEN}", "Content-Type": "text/csv"}
+    response = httpx.post(f"{args.url}/admin/cohort", content=text, headers=headers, timeout=30)
+    response.raise_for_status()
+    job_id = response.json()["job"]
+    while True:
+        time.sleep(2)
+        job = httpx.get(f"{args.url}/admin/cohort/{job_id}", headers=headers, timeout=30).json()
+        print(f"⏳ {job['delivered']}/{job['members']} delivered")
+        if job["status"] != "running":
+            break
+
+    print(f"\nCohort {job['status']} in {job.get('elapsed_s')}s — {job.get('delivered')} delivered, "
+          f"{len(job.get('failures', []))} failed, {job.get('guides_generated')}/{job.get('guides')} guides generated")
+    if job.get("delivery_latency_s"):
+        lat = job["delivery_latency_s"]
+        print(f"Delivery latency p50 {lat['p50']}s  p95 {lat['p95']}s  max {lat['max']}s")
+    for failure in job.get("failures", []):
+        print(f"  • {failure['user']}: {failure['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import json
+import os
+
+APPS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "utils", "apps.json")
+
+# App and team configurations
+ALLOWED_APPS = ["eatery", "resell", "uplift", "score", "navi", "hustle",
+                "coursegrab", "volume", "scooped", "all-in"]
+ALLOWED_TEAMS = ["android", "ios", "backend", "frontend", "design", "marketing"]
+TECH_TEAMS = ["android", "ios", "backend", "frontend"]
+EXPERIENCE_MAP = {
+    "new": "beginner",
+    "newbie": "beginner",
+    "beginner": "beginner",
+    "first time": "beginner",
+    "first-time": "beginner",
+    "no experience": "beginner",
+    "never done": "beginner",
+    "returning": "intermediate",
+    "intermediate": "intermediate",
+    "some experience": "intermediate",
+    "have experience": "experienced",
+    "experienced": "experienced",
+    "advanced": "experienced",
+    "veteran": "experienced",
+    "expert": "experienced",
+}
+
+EXPERIENCE_LEVELS = ["beginner", "intermediate", "experienced"]
+
+# Sent after a dev-team guide, in chat and in cohort welcome DMs.
+NEXT_STEPS = ("💡 *Next steps:*\n"
+              "• Ask me any questions about setup or the codebase\n"
+              "• Request the Figma link if you need design references\n"
+              "• Let me know if you need help with specific commands or dependencies")
+
+
+def load_apps(path: str = APPS_FILE) -> dict:
+    """Loads the AppDev app -> {name, repos} mapping from utils/apps.json."""
+    with open(path, "r") as f:
+        return json.load(f)
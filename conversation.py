@@ -1,15 +1,85 @@
-import google.generativeai as genai
+import json
+import re
+from conversation_memory import ConversationMemory
+from entities import extract_entities
+from metrics import Counter
 from summarize_repo import summarize_repo
 
+SUMMARY_ACTIONS = ["summarize", "setup", "contribution"]
+# After onboarding, app/team only change when the user asks to switch; otherwise
+# a mention ("the design doc for the android screens") is just a hint.
+SWITCH_REQUEST = re.compile(r"\b(switch(ing)?|chang(e|ing)|mov(e|ing)|instead|actually|onboard me|join(ing)?)\b")
+
+# path="rule" turns were answered without a Gemini call.
+planner_turns = Counter("onboarding_planner_turns_total", "Planner turns by how they were answered.", ("path",))
+planner_summaries = Counter("onboarding_planner_summaries_total", "Guides generated from the planner.")
+
+
+def llm_free_ratio() -> float:
+    """Share of turns answered without calling the model."""
+    rule, llm = planner_turns.value(path="rule"), planner_turns.value(path="llm")
+    return rule / (rule + llm) if rule + llm else 0.0
+
+
+def _summarize(state: dict) -> str:
+    planner_summaries.inc()
+    state["phase"] = "done"
+    return summarize_repo(state["app"], state["team"], state.get("level") or "beginner")
+
+
+def _rule_based_reply(found, state: dict) -> str | None:
+    """Handles turns the state machine can resolve alone; None means ask the LLM."""
+    app, team, level = state.get("app"), state.get("team"), state.get("level")
+    if app and team and level:
+        if state.get("phase") == "done":
+            return None
+        summary = _summarize(state)
+        return f"Awesome — let me summarize everything for you! 🚀\n\n{summary}"
+    if not any(found):
+        return None
+    if not app:
+        state["phase"] = "overview"
+        return "Which AppDev project are you joining? (e.g., Eatery, Resell, Uplift, Volume)"
+    if not team:
+        state["phase"] = "setup"
+        return (f"Nice, *{app.title()}*! Which subteam are you joining for this project? "
+                "(e.g., Android, iOS, Backend, Design, Marketing)")
+    state["phase"] = "experience"
+    return f"Got it — *{app.title()} {team.title()}*! Are you a new member or a returning one?"
+
+
 def conversation_planner(user_message: str, state: dict, model) -> tuple[str, dict]:
-    """Dynamically plan next response using Gemini."""
+    """Plans the next response: deterministic rules first, Gemini only for ambiguous turns."""
+    history = state.get("history")
+    if not isinstance(history, ConversationMemory):
+        # Sessions from before bounded memory carry a plain list of turns.
+        history = ConversationMemory.from_turns(history)
+    state["history"] = history
+
+    found = extract_entities(user_message)
+    locked = state.get("phase") == "done" and not SWITCH_REQUEST.search(user_message.lower())
+    mentioned = {}
+    for key, value in zip(("app", "team", "level"), found):
+        if value and locked and key in ("app", "team"):
+            mentioned[key] = value
+        elif value:
+            if state.get("phase") == "done" and key in ("app", "team") and state.get(key) != value:
+                # An explicit switch gets a fresh guide for the new app/team.
+                state["phase"] = "switch"
+            state[key] = value
+
+    reply = _rule_based_reply(found, state)
+    if reply is not None:
+        planner_turns.inc(path="rule")
+        history.append(user_message, reply)
+        return reply, state
+
+    planner_turns.inc(path="llm")
     app = state.get("app")
     team = state.get("team")
     level = state.get("level")
     phase = state.get("phase", "overview")
-
-    history = state.get("history", [])
-    history_text = "\n".join([f"User: {m['user']}\nBot: {m['bot']}" for m in history[-5:]])
+    history_text = history.render()
 
     prompt = f"""
 You are Cornell AppDev’s friendly onboarding assistant living in Slack.
@@ -26,6 +96,7 @@ You know this context:
 - team: {team}
 - level: {level}
 - phase: {phase}
+{f"- also mentioned this turn (not a request to switch): {mentioned}" if mentioned else ""}
 
 Your goals:
 1. Figure out what information the user has already given (app, team, experience level, etc.).
@@ -56,28 +127,18 @@ Return your reasoning and desired action in this JSON format:
     try:
         response = model.generate_content(prompt)
         text = response.text.strip()
-        import json
         parsed = json.loads(text[text.find("{"):text.rfind("}") + 1])
         reply = parsed.get("response", "")
         updates = parsed.get("updates", {})
         for k, v in updates.items():
-            if v:
+            if v and not (locked and k in ("app", "team")):
                 state[k] = v
-        history.append({"user": user_message, "bot": reply})
-        state["history"] = history
-        action = updates.get("action", "none")
-        if action in ["summarize", "setup", "contribution"] and state.get("app") and state.get("team"):
-            summary = summarize_repo(
-                state["app"], state["team"], phase=action if action != "summarize" else "overview"
-            )
-            reply += f"\n\n{summary}"
-        
+
+        # At most one summary per turn, whichever way the model phrased it.
         action = updates.get("action", "none")
-        if action in ["summarize", "setup", "contribution"] and state.get("app") and state.get("team"):
-            summary = summarize_repo(
-                state["app"], state["team"], phase=action if action != "summarize" else "overview"
-            )
-            reply += f"\n\n{summary}"
+        ready = state.get("app") and state.get("team")
+        if ready and (action in SUMMARY_ACTIONS or (state.get("level") and state.get("phase") != "done")):
+            reply += f"\n\n{_summarize(state)}"
 
         elif state.get("app") and not state.get("team"):
             if not any(word in reply.lower() for word in ["subteam", "team"]):
@@ -89,13 +150,7 @@ Return your reasoning and desired action in this JSON format:
                 reply += "\n\nGot it! Are you a new member or a returning one?"
             state["phase"] = "experience"
 
-        elif state.get("app") and state.get("team") and state.get("level"):
-            if not any(word in reply.lower() for word in ["welcome", "summary", "overview", "project", "team", "get started", "appdev"]):
-                reply += "\n\nAwesome — let me summarize everything for you! 🚀"
-                summary = summarize_repo(state["app"], state["team"], "overview")
-                reply += f"\n\n{summary}"
-            state["phase"] = "done"
-
+        history.append(user_message, reply)
         return reply, state
 
     except Exception as e:
@@ -0,0 +1,97 @@
+"""Fixed-size planner memory: recent turns verbatim, older turns folded into a rolling summary."""
+import os
+import re
+from collections import deque
+
+PLANNER_HISTORY_TURNS = int(os.getenv("PLANNER_HISTORY_TURNS", 6))
+PLANNER_CONTEXT_TOKENS = int(os.getenv("PLANNER_CONTEXT_TOKENS", 600))
+TURN_MAX_CHARS = 400
+SUMMARY_MAX_CHARS = 1200
+CHARS_PER_TOKEN = 4
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+
+def _gist(text: str, limit: int) -> str:
+    """First sentence (or line) of text, clipped to limit characters."""
+    first = text.strip().split("\n", 1)[0]
+    first = _SENTENCE_END.split(first, 1)[0]
+    return _clip(first, limit)
+
+
+class ConversationMemory:
+    """Ring buffer of the last `max_turns` turns plus a summary of everything older.
+
+    Each turn evicted from the buffer is folded into the summary as a one-line
+    gist, and the summary keeps only its newest lines once it outgrows
+    SUMMARY_MAX_CHARS, so a session's memory stays constant however long it
+    runs. Iterating yields the buffered turns, like the old history list.
+    """
+
+    __slots__ = ("turns", "summary")
+
+    def __init__(self, max_turns: int = PLANNER_HISTORY_TURNS):
+        self.turns = deque(maxlen=max_turns)
+        self.summary = ""
+
+    @classmethod
+    def from_turns(cls, turns, max_turns: int = PLANNER_HISTORY_TURNS) -> "ConversationMemory":
+        memory = cls(max_turns)
+        for turn in turns or []:
+            memory.append(turn["user"], turn["bot"])
+        return memory
+
+    def __iter__(self):
+        return iter(self.turns)
+
+    def __len__(self) -> int:
+        return len(self.turns)
+
+    def append(self, user: str, bot: str):
+        if len(self.turns) == self.turns.maxlen:
+            self._fold(self.turns[0])
+        self.turns.append({"user": _clip(user, TURN_MAX_CHARS), "bot": _clip(bot, TURN_MAX_CHARS)})
+
+    def _fold(self, turn: dict):
+        line = f"- User said \"{_gist(turn['user'], 120)}\"; bot replied \"{_gist(turn['bot'], 100)}\""
+        summary = f"{self.summary}\n{line}" if self.summary else line
+        if len(summary) > SUMMARY_MAX_CHARS:
+            summary = summary[len(summary) - SUMMARY_MAX_CHARS:]
+            summary = summary[summary.find("\n") + 1:] if "\n" in summary else summary
+        self.summary = summary
+
+    def render(self, budget_tokens: int = PLANNER_CONTEXT_TOKENS) -> str:
+        """Prompt text for this memory, at most budget_tokens (estimated).
+
+        The newest turns are kept first; the rolling summary gets whatever
+        budget they leave, trimmed from its oldest end.
+        """
+        budget = budget_tokens * CHARS_PER_TOKEN
+        recent = []
+        for turn in reversed(self.turns):
+            text = f"User: {turn['user']}\nBot: {turn['bot']}"
+            if len(text) + 1 > budget:
+                break
+            recent.append(text)
+            budget -= len(text) + 1
+        recent.reverse()
+
+        parts = []
+        header = "Earlier in the conversation:\n"
+        if self.summary and budget > len(header) + 40:
+            summary = self.summary
+            if len(summary) > budget - len(header):
+                summary = summary[-(budget - len(header)):]
+                summary = summary[summary.find("\n") + 1:]
+            parts.append(header + summary)
+        parts.extend(recent)
+        return "\n".join(parts)
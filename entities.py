@@ -0,0 +1,116 @@
+import difflib
+import functools
+import re
+from typing import NamedTuple
+
+from config import ALLOWED_APPS, ALLOWED_TEAMS, EXPERIENCE_MAP, load_apps
+
+REPO_TEAM_SUFFIXES = ("ios", "android", "backend", "frontend", "web")
+# apps.json prefixes that are ordinary words, not project names people say.
+GENERIC_WORDS = {"analytics", "chat", "food", "app", "all", "big", "dev", "ai"}
+
+APP_ALIASES = {
+    "transit": "ithaca-transit",
+    "course grab": "coursegrab",
+    "scoop": "scooped",
+    "allin": "all-in",
+}
+TEAM_ALIASES = {
+    "back-end": "backend",
+    "back end": "backend",
+    "front-end": "frontend",
+    "front end": "frontend",
+    "designer": "design",
+    "marketer": "marketing",
+}
+FUZZY_CUTOFF = 0.8
+# Typos change a letter or two in place; inflections ("scores", "uplifted") grow the word.
+FUZZY_MAX_LENGTH_DIFF = 1
+# Shorter words are too often real words one letter away from an app ("store").
+FUZZY_MIN_LENGTH = 6
+_FUZZY_WORD = re.compile(rf"[a-z][a-z\-]{{{FUZZY_MIN_LENGTH - 1},}}")
+
+
+class Entities(NamedTuple):
+    app: str | None
+    team: str | None
+    experience: str | None
+
+
+def _app_names(apps: dict) -> set[str]:
+    """Project names derived from apps.json, e.g. eatery-blue-ios -> eatery-blue."""
+    names = set(ALLOWED_APPS)
+    for prefix, entry in apps.items():
+        for suffix in entry["repos"]:
+            repo = f"{prefix}-{suffix}"
+            base, _, team = repo.rpartition("-")
+            if team in REPO_TEAM_SUFFIXES and base not in GENERIC_WORDS \
+                    and base.split("-")[0] not in ALLOWED_TEAMS:
+                names.add(base)
+    return names
+
+
+class EntityExtractor:
+    """Finds app, team and experience in one pass over a message.
+
+    All aliases are compiled into a single alternation (longest first, with
+    word boundaries, so "score" never matches inside "scoreboard"). Messages
+    with no exact app/team match fall back to a fuzzy match per word so small
+    typos like "andriod" still resolve; inflected words ("scores", "hustler")
+    are never fuzzy-matched to the alias they extend.
+    """
+
+    def __init__(self, apps: dict):
+        self.lookup = {}
+        for name in _app_names(apps):
+            for alias in {name, name.replace("-", " ")}:
+                self.lookup.setdefault(alias, ("app", name))
+        for alias, name in APP_ALIASES.items():
+            self.lookup[alias] = ("app", name)
+        for team in ALLOWED_TEAMS:
+            self.lookup[team] = ("team", team)
+        for alias, team in TEAM_ALIASES.items():
+            self.lookup[alias] = ("team", team)
+        for phrase, level in EXPERIENCE_MAP.items():
+            self.lookup[phrase] = ("experience", level)
+
+        alternation = "|".join(re.escape(a) for a in sorted(self.lookup, key=len, reverse=True))
+        self.pattern = re.compile(rf"(?<![a-z0-9])(?:{alternation})(?![a-z0-9])")
+        self._fuzzy = {
+            kind: [a for a, (k, _) in self.lookup.items() if k == kind and " " not in a and len(a) >= FUZZY_MIN_LENGTH - 1]
+            for kind in ("app", "team")
+        }
+
+    def extract(self, text: str) -> Entities:
+        text_lower = text.lower()
+        found = {}
+        for match in self.pattern.finditer(text_lower):
+            kind, value = self.lookup[match.group(0)]
+            found.setdefault(kind, value)
+
+        missing = [kind for kind in ("app", "team") if kind not in found]
+        if missing:
+            for word in _FUZZY_WORD.findall(text_lower):
+                for kind in missing:
+                    if kind in found:
+                        continue
+                    close = self._closest(word, kind)
+                    if close:
+                        found[kind] = self.lookup[close][1]
+        return Entities(found.get("app"), found.get("team"), found.get("experience"))
+
+    @functools.lru_cache(maxsize=4096)
+    def _closest(self, word: str, kind: str) -> str | None:
+        # Chat vocabulary repeats heavily, so memoizing difflib keeps the fallback cheap.
+        candidates = [a for a in self._fuzzy[kind]
+                      if abs(len(word) - len(a)) <= FUZZY_MAX_LENGTH_DIFF and not word.startswith(a)]
+        close = difflib.get_close_matches(word, candidates, n=1, cutoff=FUZZY_CUTOFF)
+        return close[0] if close else None
+
+
+extractor = EntityExtractor(load_apps())
+
+
+def extract_entities(text: str) -> Entities:
+    """Extract app, team and experience level from a user message."""
+    return extractor.extract(text)
@@ -1,60 +1,256 @@
-import requests, os, base64, json
+import asyncio, os, base64, threading
+import httpx
+from cache_store import CacheStore
+from singleflight import SingleFlight
+from metrics import Counter, span
+from rate_limit import scheduler, backoff_delay, current_priority, INTERACTIVE
+from repo_index import build_index
 
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
 REPO_CACHE_FILE = "repo_cache.json"
+REPO_CACHE_TTL = float(os.getenv("REPO_CACHE_TTL", 7 * 24 * 3600))
+GITHUB_MAX_RETRIES = int(os.getenv("GITHUB_MAX_RETRIES", 3))
+REPO_MISS_TTL = float(os.getenv("REPO_MISS_TTL", 3600))
 
-def load_repo_cache():
-    if os.path.exists(REPO_CACHE_FILE):
-        with open(REPO_CACHE_FILE, "r") as f:
-            return json.load(f)
-    return {}
+# One event loop + one pooled AsyncClient for the whole process. Sync callers
+# (Bolt listeners run in threads) submit coroutines onto this loop so every
+# request reuses the same keep-alive connections.
+_loop = None
+_loop_lock = threading.Lock()
+_client = None
 
-def save_repo_cache(cache):
-    with open(REPO_CACHE_FILE, "w") as f:
-        json.dump(cache, f, indent=2)
+# repo -> (etag, decoded README); lets unchanged READMEs come back as a 304.
+_readme_etags = {}
 
-def fetch_readme(repo_name: str, team: str = None) -> str:
-    """Attempts to fetch README.md from Cornell AppDev repos, with caching."""
-    github_token = os.getenv("GITHUB_TOKEN")
-    headers = {"Authorization": f"token {github_token}"} if github_token else {}
-    cache_key = f"{repo_name}-{team}" if team else repo_name
-    
-    cache = load_repo_cache()
-    if cache_key in cache:
-        cached_repo = cache[cache_key]
-        print(f"🧠 Using cached repo: {cached_repo}")
-        repo_url = f"https://api.github.com/repos/{cached_repo}/readme"
-        response = requests.get(repo_url, headers=headers)
-        if response.status_code == 200:
-            data = response.json()
-            return base64.b64decode(data["content"]).decode("utf-8", errors="ignore")
-
-    possible_repos = []
-    
+readme_flight = SingleFlight("fetch_readme")
+github_requests = Counter("onboarding_github_requests_total", "GitHub API requests by status.", ("status",))
+repo_resolutions = Counter("onboarding_repo_resolutions_total", "How (app, team) lookups were resolved.", ("source",))
+
+repo_cache = CacheStore("repos", default_ttl=REPO_CACHE_TTL, seed_file=REPO_CACHE_FILE)
+# (app, team) lookups that found no README, so repeats don't re-probe GitHub.
+repo_misses = CacheStore("repo_misses", default_ttl=REPO_MISS_TTL)
+_repo_index = None
+_repo_index_lock = threading.Lock()
+
+
+def get_repo_index():
+    """The (app, team) -> repo index, built from apps.json and the org listing on first use."""
+    global _repo_index
+    if _repo_index is None:
+        with _repo_index_lock:
+            if _repo_index is None:
+                _repo_index = build_index()
+    return _repo_index
+
+
+def _github_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="github-client", daemon=True).start()
+            _loop = loop
+    return _loop
+
+def _get_client() -> httpx.AsyncClient:
+    """Returns the shared client. Must be called from the GitHub loop."""
+    global _client
+    if _client is None:
+        github_token = os.getenv("GITHUB_TOKEN")
+        headers = {"Accept": "application/vnd.github+json"}
+        if github_token:
+            headers["Authorization"] = f"token {github_token}"
+        _client = httpx.AsyncClient(
+            base_url=GITHUB_API_URL,
+            headers=headers,
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+    return _client
+
+def _candidate_repos(repo_name: str, team: str = None) -> list[str]:
     if team:
+        possible_repos = []
         team_lower = team.lower()
         if team_lower in ["backend", "ios", "android", "frontend"]:
             possible_repos.append(f"cuappdev/{repo_name}-{team_lower}")
         possible_repos.append(f"cuappdev/{repo_name}")
-    else:
-        possible_repos = [
-            f"cuappdev/{repo_name}",
-            f"cuappdev/{repo_name}-backend",
-            f"cuappdev/{repo_name}-ios",
-            f"cuappdev/{repo_name}-android",
-            f"cuappdev/{repo_name}-frontend",
-        ]
-
-    for repo in possible_repos:
-        repo_url = f"https://api.github.com/repos/{repo}/readme"
-        response = requests.get(repo_url, headers=headers)
-
-        if response.status_code == 200:
-            data = response.json()
-            content = base64.b64decode(data["content"]).decode("utf-8", errors="ignore")
+        return possible_repos
+    return [
+        f"cuappdev/{repo_name}",
+        f"cuappdev/{repo_name}-backend",
+        f"cuappdev/{repo_name}-ios",
+        f"cuappdev/{repo_name}-android",
+        f"cuappdev/{repo_name}-frontend",
+    ]
+
+def _rate_limited(response: httpx.Response) -> bool:
+    if response.status_code == 429:
+        return True
+    return response.status_code == 403 and (
+        response.headers.get("X-RateLimit-Remaining") == "0" or "Retry-After" in response.headers)
+
+async def _github_request(label: str, level: int, send) -> httpx.Response:
+    """Awaits `send()` within the GitHub budget, backing off and retrying on rate limits.
+
+    A rate-limited response is closed before retrying, so `send` may open a stream.
+    """
+    for attempt in range(GITHUB_MAX_RETRIES + 1):
+        await scheduler.acquire_async("github", level)
+        with span("github_fetch"):
+            response = await send()
+        github_requests.inc(status=response.status_code)
+        if not _rate_limited(response) or attempt == GITHUB_MAX_RETRIES:
+            return response
+        await response.aclose()
+        delay = backoff_delay(attempt, retry_after=response.headers.get("Retry-After"),
+                              reset_at=response.headers.get("X-RateLimit-Reset"))
+        print(f"⏳ GitHub rate limit hit for {label}; backing off {delay:.1f}s")
+        scheduler.pause("github", delay)
+
+async def _get_readme(repo: str, level: int = INTERACTIVE, statuses: list = None) -> str | None:
+    """Fetches a repo's README, revalidating with If-None-Match when we have an ETag.
+
+    The final HTTP status (or "error") is appended to `statuses` when given.
+    """
+    headers = {}
+    cached = _readme_etags.get(repo)
+    if cached:
+        headers["If-None-Match"] = cached[0]
+    try:
+        response = await _github_request(repo, level, lambda: _get_client().get(f"/repos/{repo}/readme",
+                                                                               headers=headers))
+    except httpx.HTTPError as e:
+        print(f"⚠️ GitHub request for {repo} failed: {e}")
+        github_requests.inc(status="error")
+        if statuses is not None:
+            statuses.append("error")
+        return None
+
+    if statuses is not None:
+        statuses.append(response.status_code)
+    if response.status_code == 304 and cached:
+        return cached[1]
+    if response.status_code == 200:
+        data = response.json()
+        content = base64.b64decode(data["content"]).decode("utf-8", errors="ignore")
+        etag = response.headers.get("ETag")
+        if etag:
+            _readme_etags[repo] = (etag, content)
+        return content
+    return None
+
+README_NOT_FOUND = "README not found"
+
+def readme_found(readme: str) -> bool:
+    """False for fetch_readme's "README not found ..." message (a miss or a GitHub outage)."""
+    return not readme.startswith(README_NOT_FOUND)
+
+async def _fetch_readme(repo_name: str, team: str = None, level: int = INTERACTIVE) -> str:
+    cache_key = f"{repo_name}-{team}" if team else repo_name
+    possible_repos = _candidate_repos(repo_name, team)
+    not_found = f"{README_NOT_FOUND} for {repo_name} {team or ''}. Tried: {', '.join(possible_repos)}"
+
+    cached_repo = repo_cache.get(cache_key)
+    if cached_repo:
+        print(f"🧠 Using cached repo: {cached_repo}")
+        repo_resolutions.inc(source="cache")
+        content = await _get_readme(cached_repo, level)
+        if content is not None:
+            return content
+
+    if repo_misses.get(cache_key):
+        repo_resolutions.inc(source="negative")
+        return not_found
+
+    index = get_repo_index()
+    known_repo = index.resolve(repo_name, team)
+    if known_repo and known_repo != cached_repo:
+        repo_resolutions.inc(source="index")
+        content = await _get_readme(known_repo, level)
+        if content is not None:
+            repo_cache.set(cache_key, known_repo)
+            return content
+    elif known_repo is None and index.authoritative:
+        # The org listing says no such repo exists; don't guess.
+        repo_resolutions.inc(source="negative")
+        repo_misses.set(cache_key, True)
+        return not_found
+
+    # Probe every candidate at once, then keep the first hit in priority order.
+    repo_resolutions.inc(source="probe")
+    statuses = []
+    results = await asyncio.gather(*(_get_readme(repo, level, statuses) for repo in possible_repos))
+    for repo, content in zip(possible_repos, results):
+        if content is not None:
             print(f"✅ Successfully fetched README from {repo}")
-            cache[cache_key] = repo
-            save_repo_cache(cache)
+            repo_cache.set(cache_key, repo)
             return content
 
     print(f"❌ Error: None of these repos had a README for {repo_name} ({team})")
-    return f"README not found for {repo_name} {team or ''}. Tried: {', '.join(possible_repos)}"
+    if all(status == 404 for status in statuses):
+        # Only remember definite misses, not outages or rate limiting.
+        repo_misses.set(cache_key, True)
+    return not_found
+
+def _submit_fetch(repo_name: str, team: str = None):
+    # Identical in-flight lookups share one set of GitHub requests. The caller's
+    # priority is captured here since contextvars don't cross onto the GitHub loop.
+    coro = readme_flight.do_async((repo_name, team), _fetch_readme, repo_name, team, current_priority())
+    return asyncio.run_coroutine_threadsafe(coro, _github_loop())
+
+async def fetch_readme_async(repo_name: str, team: str = None) -> str:
+    """Awaitable fetch_readme, usable from any event loop."""
+    with span("readme_resolve"):
+        return await asyncio.wrap_future(_submit_fetch(repo_name, team))
+
+def fetch_readme(repo_name: str, team: str = None) -> str:
+    """Attempts to fetch README.md from Cornell AppDev repos, with caching."""
+    with span("readme_resolve"):
+        return _submit_fetch(repo_name, team).result()
+
+def resolved_repo(repo_name: str, team: str = None) -> str | None:
+    """The repo an (app, team) resolves to, without any network calls."""
+    cache_key = f"{repo_name}-{team}" if team else repo_name
+    return repo_cache.get(cache_key) or get_repo_index().resolve(repo_name, team)
+
+async def github_get(path: str, level: int = INTERACTIVE, **kwargs) -> httpx.Response:
+    """GET on the shared client within the GitHub budget. Must run on the GitHub loop."""
+    return await _github_request(path, level, lambda: _get_client().get(path, **kwargs))
+
+async def github_download(path: str, max_bytes: int, level: int = INTERACTIVE, **kwargs) -> tuple[int, bytes | None]:
+    """Streams a GET (following redirects) into memory; returns (status, body).
+
+    The body is None unless the status is 200 and it fits in `max_bytes`; an
+    oversized download is abandoned as soon as it crosses the cap.
+    """
+    client = _get_client()
+    request = client.build_request("GET", path, **kwargs)
+    response = await _github_request(path, level, lambda: client.send(request, stream=True, follow_redirects=True))
+    try:
+        if response.status_code != 200 or int(response.headers.get("Content-Length") or 0) > max_bytes:
+            return response.status_code, None
+        body = bytearray()
+        async for chunk in response.aiter_bytes():
+            body += chunk
+            if len(body) > max_bytes:
+                return response.status_code, None
+        return response.status_code, bytes(body)
+    finally:
+        await response.aclose()
+
+def run_on_github_loop(coro):
+    """Runs a coroutine on the GitHub loop and waits for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, _github_loop()).result()
+
+def close_github_client():
+    """Closes the pooled client and stops its loop (e.g. on app shutdown)."""
+    global _client, _loop
+    with _loop_lock:
+        loop, client = _loop, _client
+        _loop, _client = None, None
+    if loop is None:
+        return
+    if client is not None:
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
@@ -0,0 +1,53 @@
+import os
+
+from cache_store import CacheStore
+from metrics import Counter
+
+EVENT_DEDUP_TTL = float(os.getenv("EVENT_DEDUP_TTL", 3600))
+PURGE_EVERY = 500
+
+duplicates_suppressed = Counter("onboarding_duplicate_events_total",
+                                "Slack deliveries dropped as duplicates.", ("reason",))
+
+
+class EventDeduplicator:
+    """Remembers Slack events already accepted so redeliveries are dropped.
+
+    Claims are atomic inserts into a shared CacheStore namespace, so every
+    uvicorn worker sees the same seen-set; entries expire after `ttl` and are
+    purged periodically to keep the table bounded.
+    """
+
+    def __init__(self, ttl: float = EVENT_DEDUP_TTL, store: CacheStore = None):
+        self.ttl = ttl
+        self.store = store or CacheStore("seen_events", default_ttl=ttl, lru_size=4096, lru_ttl=ttl)
+        self._claims = 0
+
+    @staticmethod
+    def _keys(payload: dict) -> list[tuple[str, str]]:
+        event = payload.get("event") or {}
+        keys = []
+        if payload.get("event_id"):
+            keys.append(("event_id", f"event:{payload['event_id']}"))
+        if event.get("client_msg_id"):
+            # The same user message can arrive under several event ids
+            # (e.g. message.im and app_mention), but keeps its client_msg_id.
+            keys.append(("client_msg_id", f"msg:{event['client_msg_id']}"))
+        return keys
+
+    def claim(self, payload: dict, retry_num: str | None = None) -> bool:
+        """Returns True if this delivery is new and should be processed."""
+        self._claims += 1
+        if self._claims % PURGE_EVERY == 0:
+            self.store.purge_expired()
+
+        for reason, key in self._keys(payload):
+            if not self.store.add(key, retry_num or "0"):
+                duplicates_suppressed.inc(reason="retry" if retry_num else reason)
+                return False
+        return True
+
+    def release(self, payload: dict):
+        """Forgets a claimed delivery that wasn't handled, so Slack's retry is processed."""
+        for _, key in self._keys(payload):
+            self.store.delete(key)
@@ -1,93 +1,92 @@
 from slack_bolt import App
 from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse
 from slack_bolt.adapter.fastapi import SlackRequestHandler
+from slack_sdk import WebClient
+from slack_sdk.signature import SignatureVerifier
 from dotenv import load_dotenv
-from summarize_repo import summarize_repo, answer_followup
-from github_utils import fetch_readme
+from summarize_repo import stream_summary, stream_followup, summary_flight, summary_cache, get_model
+from github_utils import fetch_readme, close_github_client, readme_flight, repo_cache, get_repo_index
+from metrics import Gauge, render_metrics, span, timed, trace_request
+from workers import KeyedWorkerPool
+from session_store import SessionStore, SessionState
+from config import NEXT_STEPS, TECH_TEAMS
+from entities import extract_entities
+from idempotency import EventDeduplicator
+from slack_format import SLACK_MAX_BLOCKS, mrkdwn_to_blocks
+import webhooks
+import cohort
+import hmac
+import json
 import os
 import re
+import threading
+import time
 
 load_dotenv()
 
+# Listeners only enqueue work, so it is safe (and keeps per-user ordering) to
+# run them before Bolt sends the HTTP ack. The token is checked on the first
+# event rather than with a blocking auth.test at import.
 slack_app = App(
-    token=os.getenv("SLACK_BOT_TOKEN"),
-    signing_secret=os.getenv("SLACK_SIGNING_SECRET")
+    client=WebClient(
+        token=os.getenv("SLACK_BOT_TOKEN"),
+        base_url=os.getenv("SLACK_API_URL", WebClient.BASE_URL),
+    ),
+    signing_secret=os.getenv("SLACK_SIGNING_SECRET"),
+    process_before_response=True,
+    token_verification_enabled=False,
 )
 api = FastAPI()
 handler = SlackRequestHandler(slack_app)
+worker_pool = KeyedWorkerPool(name="onboarding")
+signature_verifier = SignatureVerifier(os.getenv("SLACK_SIGNING_SECRET") or "")
+event_dedup = EventDeduplicator()
+cohort_jobs = cohort.CohortJobs()
 
-# App and team configurations
-user_states = {}
-ALLOWED_APPS = ["eatery", "resell", "uplift", "score", "navi", "hustle",
-                "coursegrab", "volume", "scooped", "all-in"]
-ALLOWED_TEAMS = ["android", "ios", "backend", "frontend", "design", "marketing"]
-TECH_TEAMS = ["android", "ios", "backend", "frontend"]
-EXPERIENCE_MAP = {
-    "new": "beginner",
-    "newbie": "beginner",
-    "beginner": "beginner",
-    "first time": "beginner",
-    "first-time": "beginner",
-    "no experience": "beginner",
-    "never done": "beginner",
-    "returning": "intermediate",
-    "intermediate": "intermediate",
-    "some experience": "intermediate",
-    "have experience": "experienced",
-    "experienced": "experienced",
-    "advanced": "experienced",
-    "veteran": "experienced",
-    "expert": "experienced",
-}
-
-user_states = {}
-
-def extract_app(text: str) -> str | None:
-    """Extract app name from user message with fuzzy matching."""
-    text_lower = text.lower()
-    for app in ALLOWED_APPS:
-        if app in text_lower:
-            return app
-    return None
+STREAM_UPDATE_INTERVAL = float(os.getenv("SLACK_STREAM_UPDATE_INTERVAL", 1.0))
+# Build the Gemini client, caches and repo index in the background at startup
+# instead of on the first request; /readyz reports when that is done.
+WARM_ON_STARTUP = os.getenv("WARM_ON_STARTUP", "").lower() in ("1", "true", "yes")
 
+BUSY_MESSAGE = ("I'm helping a lot of people onboard right now 🙏 "
+                "Give me a minute and send that again!")
 
-def extract_team(text: str) -> str | None:
-    """Extract team name from user message."""
-    text_lower = text.lower()
-    for team in ALLOWED_TEAMS:
-        if team in text_lower:
-            return team
-    if "back-end" in text_lower or "back end" in text_lower:
-        return "backend"
-    if "front-end" in text_lower or "front end" in text_lower:
-        return "frontend"
-    return None
-
-
-def extract_experience(text: str) -> str | None:
-    """Extract experience level from user message."""
-    text_lower = text.lower()
-    for keyword, level in EXPERIENCE_MAP.items():
-        if keyword in text_lower:
-            return level
-    return None
+user_states = SessionStore()
 
+Gauge("onboarding_worker_queue_depth", "Messages queued or running on the worker pool.",
+      lambda: worker_pool.pending)
+Gauge("onboarding_sessions", "User sessions currently held in memory.", lambda: len(user_states))
+for _flight in (summary_flight, readme_flight):
+    Gauge(f"onboarding_{_flight.name}_coalesced_total", f"{_flight.name} calls served by an in-flight call.",
+          lambda f=_flight: f.coalesced, metric_type="counter")
 
 def is_tech_team(team: str) -> bool:
     return team in TECH_TEAMS
 
 @slack_app.event("message")
-def handle_message(event, say):
+def handle_message(event, say, client):
+    """Acks immediately; the actual conversation step runs on the worker pool."""
     user_id = event.get("user")
-    text = event.get("text", "").strip()
     if not user_id or "bot_id" in event:
         return
+    if not worker_pool.submit(user_id, process_message, event, say, client):
+        say(BUSY_MESSAGE)
+
 
-    state = user_states.get(user_id, {})
+def process_message(event, say, client):
+    with trace_request(user=event.get("user"), event_ts=event.get("ts")), span("handle_message"):
+        _process_message(event, timed("slack_say", say), client)
+
+
+def _process_message(event, say, client):
+    user_id = event.get("user")
+    text = event.get("text", "").strip()
+
+    state = user_states.get(user_id) or SessionState()
     text_lower = text.lower()
-    found_app = extract_app(text)
-    found_team = extract_team(text)
-    found_experience = extract_experience(text)
+    found_app, found_team, found_experience = extract_entities(text)
     if "onboard" in text_lower or "help me start" in text_lower or "get started" in text_lower:
         if found_app and found_team and found_experience:
             state.update({
@@ -98,7 +97,7 @@ def handle_message(event, say):
             })
             user_states[user_id] = state
             say(f"Perfect! Onboarding you to *{found_app.title()} {found_team.title()}* as a *{found_experience}* member.")
-            _deliver_onboarding(user_id, state, say)
+            _deliver_onboarding(user_id, state, say, client)
             return
             
         elif found_app and found_team:
@@ -176,15 +175,15 @@ def handle_message(event, say):
             app = state["app"]
             team = state["team"]
             say(f"Awesome! Getting your *{app.title()} {team.title()}* onboarding guide ready... 🚀")
-            _deliver_onboarding(user_id, state, say)
+            _deliver_onboarding(user_id, state, say, client)
             return
         else:
             say("Just to clarify — are you new to this, or do you have experience? "
                 "(You can say: new, returning, experienced, etc.)")
             return
     if state.get("phase") == "onboarded" and state.get("readme"):
-        reply = answer_followup(text, state["app"], state["team"], state["readme"])
-        say(reply)
+        _say_streaming(say, client, stream_followup(text, state["app"], state["team"], state["readme"]),
+                       placeholder="🤔 Thinking...")
         return
     if not state or state.get("phase") is None:
         if found_app and found_team:
@@ -203,34 +202,170 @@ def handle_message(event, say):
             "or tell me which project and team you're joining (e.g., 'Resell Backend').")
         return
 
-def _deliver_onboarding(user_id: str, state: dict, say):
+def _say_streaming(say, client, snapshots, placeholder: str = "✍️ Writing your guide...") -> str:
+    """Posts a placeholder, then edits it in place as streamed text arrives.
+
+    Updates are throttled to one per STREAM_UPDATE_INTERVAL seconds to stay under
+    chat.update's rate limit; the final text is always written, as Block Kit
+    sections (with the plain text as the notification fallback).
+    """
+    message = say(placeholder)
+    channel, ts = message["channel"], message["ts"]
+    update = timed("slack_update", client.chat_update)
+    shown, text = placeholder, placeholder
+    last_update = 0.0
+    for text in snapshots:
+        if text and text != shown and time.monotonic() - last_update >= STREAM_UPDATE_INTERVAL:
+            update(channel=channel, ts=ts, text=text)
+            shown, last_update = text, time.monotonic()
+    blocks = mrkdwn_to_blocks(text) if text else []
+    if 0 < len(blocks) <= SLACK_MAX_BLOCKS:
+        update(channel=channel, ts=ts, text=text, blocks=blocks)
+    elif text and text != shown:
+        update(channel=channel, ts=ts, text=text)
+    return text
+
+
+def _deliver_onboarding(user_id: str, state: dict, say, client):
     """Helper function to fetch and deliver onboarding materials."""
     app = state["app"]
     team = state["team"]
     experience = state["experience"]
     
     try:
-        readme = fetch_readme(app, team)
-        summary = summarize_repo(app, team, experience)
-        
+        # Stream first; follow-ups reuse the README the guide was generated from,
+        # and a cached guide's README is fetched only once it's on screen.
+        sources = {}
+        _say_streaming(say, client, stream_summary(app, team, experience, sources))
+        readme = sources.get("readme") or fetch_readme(app, team)
         state.update({"phase": "onboarded", "readme": readme})
         user_states[user_id] = state
-        
-        say(summary)
         if is_tech_team(team):
-            say("\n💡 *Next steps:*\n"
-                "• Ask me any questions about setup or the codebase\n"
-                "• Request the Figma link if you need design references\n"
-                "• Let me know if you need help with specific commands or dependencies")
+            say(f"\n{NEXT_STEPS}")
     except Exception as e:
         say(f"⚠️ Sorry, I ran into an issue fetching the onboarding materials: {e}\n"
             "Please try again or reach out to your team lead.")
 
 
+_warmed = threading.Event()
+
+
+def warm_up():
+    """Pays the lazy-initialization costs up front: Gemini SDK, cache databases, repo index."""
+    start = time.perf_counter()
+    try:
+        get_model()
+        for store in (summary_cache, repo_cache, event_dedup.store):
+            store.warm()
+        get_repo_index()
+        print(f"🔥 Warmed up in {time.perf_counter() - start:.2f}s")
+    except Exception as e:
+        print(f"⚠️ Warm-up failed, continuing lazily: {e}")
+    _warmed.set()
+
+
+@api.on_event("startup")
+def start_warm_up():
+    if WARM_ON_STARTUP:
+        threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    else:
+        _warmed.set()
+
+
+@api.get("/healthz")
+def healthz():
+    return {"ok": True}
+
+
+@api.get("/readyz")
+def readyz():
+    if not _warmed.is_set():
+        return JSONResponse({"ready": False}, status_code=503)
+    return {"ready": True}
+
+
+@api.get("/metrics")
+def metrics_endpoint():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 @api.post("/slack/events")
 async def slack_events(request: Request):
+    body = await request.body()
+    if request.headers.get("content-type", "").startswith("application/json") \
+            and signature_verifier.is_valid_request(body, dict(request.headers)):
+        payload = json.loads(body)
+        # Slack redelivers events we were slow to ack (X-Slack-Retry-Num);
+        # anything already accepted is acked again without reprocessing.
+        # claim() writes to SQLite, which can wait on other workers' locks; keep it off the loop.
+        if payload.get("type") == "event_callback":
+            if not await run_in_threadpool(event_dedup.claim, payload, request.headers.get("x-slack-retry-num")):
+                return PlainTextResponse("", headers={"X-Slack-No-Retry": "1"})
+            # A delivery we failed to handle must not suppress Slack's retry of it.
+            try:
+                response = await handler.handle(request)
+            except Exception:
+                await run_in_threadpool(event_dedup.release, payload)
+                raise
+            if not 200 <= response.status_code < 300:
+                await run_in_threadpool(event_dedup.release, payload)
+            return response
     return await handler.handle(request)
 
+@api.post("/github/webhook")
+async def github_webhook(request: Request):
+    body = await request.body()
+    if not webhooks.GITHUB_WEBHOOK_SECRET:
+        return JSONResponse({"error": "GITHUB_WEBHOOK_SECRET is not configured"}, status_code=503)
+    if not webhooks.verify_signature(body, request.headers.get("x-hub-signature-256")):
+        return JSONResponse({"error": "invalid signature"}, status_code=401)
+    event = request.headers.get("x-github-event")
+    if event != "push":
+        return {"ok": True, "ignored": event}
+    # Walking the guide cache is blocking SQLite work; keep it off the event loop.
+    return {"ok": True, "queued": await run_in_threadpool(webhooks.handle_push, json.loads(body))}
+
+def _is_admin(request: Request) -> bool:
+    token = request.headers.get("authorization", "").removeprefix("Bearer ")
+    return bool(cohort.ADMIN_TOKEN) and hmac.compare_digest(token, cohort.ADMIN_TOKEN)
+
+@api.post("/admin/cohort")
+async def start_cohort(request: Request):
+    """Onboards a roster (CSV, or JSON {"rows": [...]}) in the background."""
+    if not _is_admin(request):
+        return JSONResponse({"error": "unauthorized"}, status_code=401)
+    body = await request.body()
+    if request.headers.get("content-type", "").startswith("application/json"):
+        try:
+            payload = json.loads(body)
+        except ValueError as e:
+            return JSONResponse({"error": f"invalid JSON: {e}"}, status_code=400)
+        raw = payload.get("rows") if isinstance(payload, dict) else None
+        if not isinstance(raw, list):
+            return JSONResponse({"error": 'expected a JSON object {"rows": [...]}'}, status_code=400)
+    else:
+        raw = body.decode("utf-8", errors="replace")
+    rows, rejected = cohort.parse_roster(raw)
+    if not rows:
+        return JSONResponse({"error": "no valid roster rows", "rejected": rejected}, status_code=400)
+    job_id = cohort_jobs.start(rows, rejected, slack_app.client, user_states)
+    return {"job": job_id, "members": len(rows), "guides": len(cohort.group_rows(rows)), "rejected": rejected}
+
+@api.get("/admin/cohort/{job_id}")
+def cohort_status(job_id: str, request: Request):
+    if not _is_admin(request):
+        return JSONResponse({"error": "unauthorized"}, status_code=401)
+    job = cohort_jobs.get(job_id)
+    if job is None:
+        return JSONResponse({"error": "unknown job"}, status_code=404)
+    return job
+
 @slack_app.event("app_home_opened")
 def handle_app_home_opened_events(body, logger):
     logger.info("🪄 Ignored app_home_opened event")
+
+@api.on_event("shutdown")
+def shutdown_background_work():
+    worker_pool.shutdown(wait=False)
+    webhooks.refresh_pool.shutdown(wait=False)
+    close_github_client()
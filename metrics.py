@@ -0,0 +1,171 @@
+"""In-process metrics with Prometheus text exposition, plus optional per-request traces.
+
+Set TRACE_LOG=<path> to append one JSON line per handled message listing every
+span (stage, duration, error) that ran on the handling thread.
+"""
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+
+TRACE_LOG = os.getenv("TRACE_LOG")
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_registry = []
+_registry_lock = threading.Lock()
+_trace = contextvars.ContextVar("trace", default=None)
+_trace_log_lock = threading.Lock()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_str(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(labels.get(n, "") for n in self.labelnames), 0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = list(self._values.items())
+        lines += [f"{self.name}{_label_str(self.labelnames, k)} {v}" for k, v in items]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0, 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += 1
+            series[2] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(k, (list(s[0]), s[1], s[2])) for k, s in self._series.items()]
+        names = self.labelnames + ("le",)
+        for key, (counts, total, summed) in items:
+            for bound, count in zip(self.buckets, counts):
+                lines.append(f"{self.name}_bucket{_label_str(names, key + (bound,))} {count}")
+            lines.append(f"{self.name}_bucket{_label_str(names, key + ('+Inf',))} {total}")
+            lines.append(f"{self.name}_sum{_label_str(self.labelnames, key)} {summed}")
+            lines.append(f"{self.name}_count{_label_str(self.labelnames, key)} {total}")
+        return lines
+
+
+class Gauge:
+    """Metric whose value is read from a callback at scrape time.
+
+    Use metric_type="counter" for monotonic values kept elsewhere (e.g. SingleFlight stats).
+    """
+
+    def __init__(self, name: str, help: str, fn, metric_type: str = "gauge"):
+        self.name, self.help, self.fn, self.metric_type = name, help, fn, metric_type
+        with _registry_lock:
+            _registry.append(self)
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.metric_type}",
+                f"{self.name} {self.fn()}"]
+
+
+stage_seconds = Histogram("onboarding_stage_seconds", "Time spent per pipeline stage.", ("stage",))
+stage_errors = Counter("onboarding_stage_errors_total", "Errors raised or swallowed per stage.", ("stage",))
+cache_requests = Counter("onboarding_cache_requests_total", "Cache lookups by cache and result.", ("cache", "result"))
+llm_tokens = Counter("onboarding_llm_tokens_total", "Gemini tokens by direction.", ("kind",))
+
+
+@contextlib.contextmanager
+def span(stage: str):
+    """Times a block as `stage`; exceptions are counted and re-raised."""
+    start = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = repr(e)
+        stage_errors.inc(stage=stage)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        stage_seconds.observe(elapsed, stage=stage)
+        trace = _trace.get()
+        if trace is not None:
+            trace["spans"].append({"stage": stage, "ms": round(elapsed * 1000, 2), "error": error})
+
+
+def timed(stage: str, fn):
+    """Wraps fn so each call is recorded as a span."""
+    def wrapper(*args, **kwargs):
+        with span(stage):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def record_error(stage: str):
+    stage_errors.inc(stage=stage)
+    trace = _trace.get()
+    if trace is not None:
+        trace["spans"].append({"stage": stage, "ms": 0, "error": "handled"})
+
+
+@contextlib.contextmanager
+def trace_request(**fields):
+    """Collects spans for one handled message and logs them when TRACE_LOG is set."""
+    if not TRACE_LOG:
+        yield
+        return
+    trace = {"ts": time.time(), **fields, "spans": []}
+    token = _trace.set(trace)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _trace.reset(token)
+        trace["total_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        with _trace_log_lock, open(TRACE_LOG, "a") as f:
+            f.write(json.dumps(trace) + "\n")
+
+
+def render_metrics() -> str:
+    with _registry_lock:
+        metrics = list(_registry)
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
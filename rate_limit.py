@@ -0,0 +1,246 @@
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from cache_store import CACHE_DB_FILE
+from metrics import Counter, Gauge, Histogram
+
+INTERACTIVE = 0
+BACKGROUND = 10
+# Share of each bucket that background calls leave for interactive ones.
+BACKGROUND_RESERVE = float(os.getenv("RATE_LIMIT_BACKGROUND_RESERVE", 0.2))
+
+_priority = contextvars.ContextVar("outbound_priority", default=INTERACTIVE)
+
+upstream_requests = Counter("onboarding_upstream_requests_total",
+                            "Outbound calls admitted by the scheduler.", ("upstream", "priority"))
+upstream_wait = Histogram("onboarding_upstream_wait_seconds",
+                          "Time calls waited for an upstream token.", ("upstream",))
+upstream_backoffs = Counter("onboarding_upstream_backoffs_total",
+                            "Rate-limit responses that triggered a backoff.", ("upstream",))
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+@contextlib.contextmanager
+def priority(level: int):
+    """Runs outbound calls made inside the block at the given priority."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def backoff_delay(attempt: int, retry_after=None, reset_at=None, base: float = 1.0, cap: float = 60.0) -> float:
+    """Seconds to wait before retry `attempt` (0-based).
+
+    Honors Retry-After (seconds) and GitHub's X-RateLimit-Reset (epoch seconds)
+    when present; otherwise uses full-jitter exponential backoff.
+    """
+    if retry_after is not None:
+        try:
+            return min(float(retry_after), cap)
+        except ValueError:
+            pass
+    if reset_at is not None:
+        try:
+            return min(max(float(reset_at) - time.time(), 0.0) + random.uniform(0, 1), cap)
+        except ValueError:
+            pass
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def _priority_label(level: int) -> str:
+    return "interactive" if level <= INTERACTIVE else "background"
+
+
+_BUCKET_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_buckets (
+    name         TEXT PRIMARY KEY,
+    tokens       REAL NOT NULL,
+    updated_at   REAL NOT NULL,
+    paused_until REAL NOT NULL DEFAULT 0
+)
+"""
+
+
+class SharedBucket:
+    """Token-bucket state kept in the shared SQLite file (cache.db).
+
+    Every uvicorn worker and CLI on the host draws from the same row, so they
+    share one budget instead of each getting the full rate. A take is one
+    short IMMEDIATE transaction; wall-clock time keeps refills consistent
+    across processes. Nothing touches the database until the first take.
+    """
+
+    def __init__(self, name: str, rate: float, burst: float, path: str = None):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.path = path or CACHE_DB_FILE
+        # Last value seen by this process; the gauge doesn't hit SQLite.
+        self.tokens = burst
+        self._local = threading.local()
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            if not self._ready:
+                conn.execute(_BUCKET_SCHEMA)
+                self._ready = True
+            self._local.conn = conn
+        return conn
+
+    def _update(self, fn):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = conn.execute("SELECT tokens, updated_at, paused_until FROM rate_buckets WHERE name = ?",
+                               (self.name,)).fetchone()
+            tokens, updated_at, paused_until = row or (self.burst, now, 0.0)
+            tokens = min(self.burst, tokens + max(now - updated_at, 0.0) * self.rate)
+            tokens, paused_until, result = fn(now, tokens, paused_until)
+            conn.execute("INSERT OR REPLACE INTO rate_buckets (name, tokens, updated_at, paused_until) "
+                         "VALUES (?, ?, ?, ?)", (self.name, tokens, now, paused_until))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self.tokens = tokens
+        return result
+
+    def take(self, floor: float = 1.0) -> float:
+        """Takes a token if at least `floor` are left; otherwise returns seconds to wait."""
+        def take(now, tokens, paused_until):
+            if now < paused_until:
+                return tokens, paused_until, paused_until - now
+            if tokens >= floor:
+                return tokens - 1, paused_until, 0.0
+            return tokens, paused_until, (floor - tokens) / self.rate
+        return self._update(take)
+
+    def pause(self, seconds: float):
+        self._update(lambda now, tokens, paused_until: (tokens, max(paused_until, now + seconds), None))
+
+
+class Upstream:
+    """A shared token bucket plus this process's priority-ordered queue of waiters.
+
+    Background callers may not take the last BACKGROUND_RESERVE of the bucket,
+    so work in other processes (warm_cache.py, refreshes) leaves headroom for
+    live users even though they don't share a queue.
+    """
+
+    def __init__(self, name: str, rate: float, burst: float, path: str = None):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.bucket = SharedBucket(name, rate, burst, path)
+        self._waiters = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        Gauge(f"onboarding_{name}_tokens_available", f"Tokens left in the {name} bucket.",
+              lambda: round(self.bucket.tokens, 2))
+
+    def _floor(self, level: int) -> float:
+        if level <= INTERACTIVE:
+            return 1.0
+        return max(1.0, min(self.burst, 1.0 + self.burst * BACKGROUND_RESERVE))
+
+    def acquire(self, level: int):
+        start = time.monotonic()
+        entry = (level, next(self._seq))
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    if self._waiters[0] == entry:
+                        wait = self.bucket.take(self._floor(level))
+                        if wait <= 0:
+                            heapq.heappop(self._waiters)
+                            self._cond.notify_all()
+                            break
+                        # Other processes may take tokens meanwhile; re-check at least every second.
+                        self._cond.wait(min(wait, 1.0))
+                    else:
+                        self._cond.wait()
+            except BaseException:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+                raise
+        upstream_wait.observe(time.monotonic() - start, upstream=self.name)
+        upstream_requests.inc(upstream=self.name, priority=_priority_label(level))
+
+    def pause(self, seconds: float):
+        """Holds every caller of this upstream, in every process, until the backoff has passed."""
+        upstream_backoffs.inc(upstream=self.name)
+        self.bucket.pause(seconds)
+        with self._cond:
+            self._cond.notify_all()
+
+
+class OutboundScheduler:
+    def __init__(self):
+        self._upstreams = {}
+
+    def configure(self, name: str, rate: float, burst: float) -> Upstream:
+        self._upstreams[name] = Upstream(name, rate, burst)
+        return self._upstreams[name]
+
+    def upstream(self, name: str) -> Upstream:
+        return self._upstreams[name]
+
+    def acquire(self, name: str, level: int = None):
+        """Blocks until `name` has budget for one call, higher priorities first."""
+        self._upstreams[name].acquire(current_priority() if level is None else level)
+
+    async def acquire_async(self, name: str, level: int = None):
+        # The bucket lives in SQLite, so even an uncontended take stays off the event loop.
+        level = current_priority() if level is None else level
+        await asyncio.get_running_loop().run_in_executor(None, self._upstreams[name].acquire, level)
+
+    def pause(self, name: str, seconds: float):
+        self._upstreams[name].pause(seconds)
+
+    def call(self, name: str, fn, *args, is_rate_limited=None, retries: int = 4, **kwargs):
+        """Calls fn under the upstream's budget, retrying rate-limit errors with backoff."""
+        for attempt in range(retries + 1):
+            self.acquire(name)
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if attempt == retries or not (is_rate_limited or _looks_rate_limited)(e):
+                    raise
+                self.pause(name, backoff_delay(attempt, retry_after=_retry_after(e)))
+
+
+def _looks_rate_limited(error: Exception) -> bool:
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    return code == 429 or type(error).__name__ in ("ResourceExhausted", "TooManyRequests")
+
+
+def _retry_after(error: Exception):
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    return headers.get("Retry-After") if headers else None
+
+
+scheduler = OutboundScheduler()
+scheduler.configure("gemini", rate=float(os.getenv("GEMINI_RPM", 60)) / 60, burst=float(os.getenv("GEMINI_BURST", 10)))
+scheduler.configure("github", rate=float(os.getenv("GITHUB_RPH", 5000)) / 3600, burst=float(os.getenv("GITHUB_BURST", 100)))
@@ -0,0 +1,130 @@
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+FOLLOWUP_TOP_K = int(os.getenv("FOLLOWUP_TOP_K", 4))
+FOLLOWUP_CONTEXT_CHARS = int(os.getenv("FOLLOWUP_CONTEXT_CHARS", 6000))
+MAX_CHUNK_CHARS = 1500
+INDEX_CACHE_SIZE = 64
+
+_HEADING = re.compile(r"^#{1,6}\s")
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9_.\-]*")
+
+
+def tokenize(text: str) -> list[str]:
+    return [t.strip(".-") for t in _TOKEN.findall(text.lower())]
+
+
+def split_sections(readme: str) -> list[str]:
+    """Splits a README at Markdown headings (ignoring ones inside ``` fences).
+
+    Oversized sections are further split on blank lines so one huge section
+    can't crowd everything else out of the prompt.
+    """
+    sections, current, in_fence = [], [], False
+    for line in readme.splitlines():
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        if not in_fence and _HEADING.match(line) and current:
+            sections.append("\n".join(current).strip())
+            current = []
+        current.append(line)
+    if current:
+        sections.append("\n".join(current).strip())
+
+    chunks = []
+    for section in filter(None, sections):
+        if len(section) <= MAX_CHUNK_CHARS:
+            chunks.append(section)
+            continue
+        heading = section.splitlines()[0] if _HEADING.match(section) else ""
+        piece = ""
+        for para in section.split("\n\n"):
+            if piece and len(piece) + len(para) > MAX_CHUNK_CHARS:
+                chunks.append(piece.strip())
+                piece = heading + "\n" if heading else ""
+            piece += para + "\n\n"
+        if piece.strip():
+            chunks.append(piece.strip())
+    return chunks
+
+
+class ReadmeIndex:
+    """BM25 index over one README's sections, scored with vectorized NumPy."""
+
+    def __init__(self, readme: str, k1: float = 1.5, b: float = 0.75):
+        self.chunks = split_sections(readme)
+        self.k1, self.b = k1, b
+        self.vocab = {}
+        rows, cols = [], []
+        for i, chunk in enumerate(self.chunks):
+            for token in tokenize(chunk):
+                rows.append(i)
+                cols.append(self.vocab.setdefault(token, len(self.vocab)))
+
+        self.tf = np.zeros((len(self.chunks), max(len(self.vocab), 1)), dtype=np.float32)
+        np.add.at(self.tf, (rows, cols), 1.0)
+        doc_len = self.tf.sum(axis=1)
+        avg_len = doc_len.mean() if len(doc_len) else 1.0
+        self._norm = (k1 * (1 - b + b * doc_len / max(avg_len, 1.0)))[:, None]
+        df = (self.tf > 0).sum(axis=0)
+        n = len(self.chunks)
+        self.idf = np.log(1 + (n - df + 0.5) / (df + 0.5)).astype(np.float32)
+
+    def scores(self, query: str) -> np.ndarray:
+        ids = sorted({self.vocab[t] for t in tokenize(query) if t in self.vocab})
+        if not ids:
+            return np.zeros(len(self.chunks), dtype=np.float32)
+        tf = self.tf[:, ids]
+        return (self.idf[ids] * tf * (self.k1 + 1) / (tf + self._norm)).sum(axis=1)
+
+    def top_chunks(self, query: str, top_k: int = FOLLOWUP_TOP_K, max_chars: int = FOLLOWUP_CONTEXT_CHARS) -> list[str]:
+        """Best-matching chunks within max_chars, returned in README order."""
+        scores = self.scores(query)
+        if not scores.any():
+            order = range(len(self.chunks))
+        else:
+            order = [i for i in np.argsort(-scores, kind="stable") if scores[i] > 0]
+        picked, used = [], 0
+        for i in order:
+            if len(picked) == top_k:
+                break
+            size = len(self.chunks[i])
+            if picked and used + size > max_chars:
+                continue
+            picked.append(i)
+            used += size
+        return [self.chunks[i] for i in sorted(picked)]
+
+
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_index(readme: str) -> ReadmeIndex:
+    """Returns the index for this README version, building it at most once."""
+    key = hashlib.sha256(readme.encode("utf-8")).hexdigest()
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is not None:
+            _indexes.move_to_end(key)
+            return index
+    index = ReadmeIndex(readme)
+    with _indexes_lock:
+        _indexes[key] = index
+        while len(_indexes) > INDEX_CACHE_SIZE:
+            _indexes.popitem(last=False)
+    return index
+
+
+def retrieve_context(readme: str, query: str, top_k: int = None, max_chars: int = None) -> str:
+    """README excerpt for a follow-up prompt; short READMEs are passed through whole."""
+    top_k = top_k or FOLLOWUP_TOP_K
+    max_chars = max_chars or FOLLOWUP_CONTEXT_CHARS
+    if len(readme) <= max_chars:
+        return readme
+    return "\n\n...\n\n".join(get_index(readme).top_chunks(query, top_k, max_chars))
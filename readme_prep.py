@@ -0,0 +1,182 @@
+"""Shrinks a README to the parts an onboarding guide needs before it goes into a prompt.
+
+Badges, images, HTML, screenshot tables and sections like changelogs or
+contributor lists are dropped; the remaining sections are ranked for the
+member's role and kept, in README order, within README_PROMPT_TOKENS.
+"""
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from metrics import Counter
+from readme_index import split_sections
+
+README_PROMPT_TOKENS = int(os.getenv("README_PROMPT_TOKENS", 2500))
+CHARS_PER_TOKEN = 4
+PREP_CACHE_SIZE = 128
+
+prep_tokens = Counter("onboarding_readme_prep_tokens_total",
+                      "README tokens before and after preprocessing.", ("kind",))
+
+_HTML_COMMENT = re.compile(r"<!--.*?-->", re.S)
+_HTML_TAG = re.compile(r"</?[a-zA-Z][^>\n]*>")
+_IMAGE = re.compile(r"\[!\[[^\]]*\]\([^)]*\)\]\([^)]*\)|!\[[^\]]*\]\([^)]*\)")
+_HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+_TABLE_ROW = re.compile(r"^\s*\|.*\|\s*$")
+
+DROP_SECTIONS = ("changelog", "change log", "release notes", "contributor", "authors", "maintainers",
+                 "license", "acknowledg", "credits", "screenshot", "code of conduct", "star history",
+                 "made with", "demo", "gallery", "team members")
+
+SETUP_WORDS = ("setup", "set up", "install", "getting started", "quickstart", "quick start", "prerequisite",
+               "requirement", "dependenc", "environment", "env", "config", "secret", "credential", "run",
+               "build", "develop", "local", "docker", "database", "migrat", "test", "usage", "deploy")
+ROLE_WORDS = {
+    "ios": ("xcode", "cocoapods", "pod", "swift", "simulator", "ios"),
+    "android": ("gradle", "android studio", "emulator", "kotlin", "android", "sdk"),
+    "backend": ("server", "api", "docker", "database", "postgres", "flask", "django", "node", "endpoint"),
+    "frontend": ("npm", "yarn", "node", "web", "react", "next"),
+}
+SETUP_HEADINGS = ("setup", "set up", "install", "getting started", "quick", "prerequisite", "running", "run ")
+OVERVIEW_WORDS = ("about", "overview", "introduction", "feature", "description", "design", "what is")
+_COMMAND = re.compile(r"\b(npm|yarn|pnpm|pip|pip3|pod|bundle|brew|docker|docker-compose|python|python3|"
+                      r"flask|gradle|\./gradlew|make|export|cp|git clone|source|xcodebuild)\b")
+
+
+def _clean_line(line: str) -> tuple[str, bool]:
+    had_media = bool(_IMAGE.search(line)) or "<img" in line.lower()
+    return _HTML_TAG.sub("", _IMAGE.sub("", line)).rstrip(), had_media
+
+
+def _is_empty_row(row: str) -> bool:
+    return not re.sub(r"[|\s:\-]", "", row)
+
+
+def strip_noise(readme: str) -> str:
+    """Removes HTML, badges, images and screenshot tables; code fences are kept verbatim."""
+    out, table, in_fence = [], [], False
+
+    def flush_table():
+        rows = [row for row, _ in table]
+        had_media = any(media for _, media in table)
+        # A screenshot table is just captions once its images are gone.
+        if not (had_media and all(_is_empty_row(r) for r, media in table if media)):
+            out.extend(rows)
+        table.clear()
+
+    for raw in _HTML_COMMENT.sub("", readme).splitlines():
+        if raw.lstrip().startswith("```"):
+            in_fence = not in_fence
+        if in_fence or raw.lstrip().startswith("```"):
+            flush_table()
+            out.append(raw)
+            continue
+        line, had_media = _clean_line(raw)
+        if _TABLE_ROW.match(raw):
+            table.append((line, had_media))
+            continue
+        flush_table()
+        if had_media and not line.strip():
+            continue
+        if not line.strip() and out and not out[-1].strip():
+            continue
+        out.append(line)
+    flush_table()
+    return "\n".join(out).strip()
+
+
+def _heading(section: str) -> str:
+    match = _HEADING.match(section.split("\n", 1)[0])
+    return match.group(2).lower() if match else ""
+
+
+def _level(section: str) -> int:
+    match = _HEADING.match(section.split("\n", 1)[0])
+    return len(match.group(1)) if match else 0
+
+
+def _kept_sections(readme: str) -> list[str]:
+    """Sections of the cleaned README minus dropped ones (and their subsections)."""
+    kept, drop_level = [], None
+    for section in split_sections(strip_noise(readme)):
+        level = _level(section)
+        if drop_level is not None and (level == 0 or level > drop_level):
+            continue
+        drop_level = level if any(word in _heading(section) for word in DROP_SECTIONS) else None
+        if drop_level is None:
+            kept.append(section)
+    return kept
+
+
+def _score(section: str, role: str, position: int) -> float:
+    heading = _heading(section)
+    text = section.lower()
+    role_words = ROLE_WORDS.get(role, ())
+    if not role_words:
+        # Design/marketing guides are built around what the app is, not how to run it.
+        score = 3.0 * sum(w in heading for w in OVERVIEW_WORDS) + 0.5 * sum(w in heading for w in SETUP_WORDS)
+    else:
+        score = 3.0 * sum(w in heading for w in SETUP_WORDS) + 1.0 * sum(w in heading for w in role_words)
+        score += 0.2 * sum(w in text for w in role_words)
+        score += min(len(_COMMAND.findall(text)), 5) * 0.5 if "```" in section or "`" in section else 0
+    # The README's opening section usually says what the app is.
+    return score + (5.0 if position == 0 else 0.0)
+
+
+def _prepare(readme: str, role: str, budget_tokens: int) -> str:
+    sections = _kept_sections(readme)
+    budget = budget_tokens * CHARS_PER_TOKEN
+    if sum(len(s) + 2 for s in sections) <= budget:
+        return "\n\n".join(sections)
+
+    ranked = sorted(range(len(sections)), key=lambda i: (-_score(sections[i], role, i), i))
+    picked, used = [], 0
+    for i in ranked:
+        size = len(sections[i]) + 2
+        if used + size > budget:
+            continue
+        picked.append(i)
+        used += size
+    return "\n\n".join(sections[i] for i in sorted(picked))
+
+
+_prepared = OrderedDict()
+_prepared_lock = threading.Lock()
+
+
+def prepare_readme(readme: str, role: str, budget_tokens: int = None) -> str:
+    """README trimmed for a `role` guide; cached per README hash, role and budget."""
+    budget_tokens = budget_tokens or README_PROMPT_TOKENS
+    role = role.lower()
+    key = (hashlib.sha256(readme.encode("utf-8")).hexdigest(), role if role in ROLE_WORDS else "", budget_tokens)
+    with _prepared_lock:
+        cached = _prepared.get(key)
+        if cached is not None:
+            _prepared.move_to_end(key)
+    if cached is None:
+        cached = _prepare(readme, role, budget_tokens)
+        with _prepared_lock:
+            _prepared[key] = cached
+            while len(_prepared) > PREP_CACHE_SIZE:
+                _prepared.popitem(last=False)
+    prep_tokens.inc(len(readme) // CHARS_PER_TOKEN, kind="raw")
+    prep_tokens.inc(len(cached) // CHARS_PER_TOKEN, kind="kept")
+    return cached
+
+
+def setup_commands(readme: str) -> list[str]:
+    """Shell commands in a README's setup/run sections (fenced lines and inline code)."""
+    commands = []
+    for section in split_sections(readme):
+        if not any(word in _heading(section) for word in SETUP_HEADINGS):
+            continue
+        in_fence = False
+        for line in section.splitlines():
+            if line.lstrip().startswith("```"):
+                in_fence = not in_fence
+                continue
+            candidates = [line.strip().lstrip("$ ")] if in_fence else re.findall(r"`([^`\n]+)`", line)
+            commands += [c.strip() for c in candidates if _COMMAND.match(c.strip())]
+    return list(dict.fromkeys(commands))
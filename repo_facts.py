@@ -0,0 +1,353 @@
+"""Setup facts (dependencies, env vars, run commands) parsed from a repo's build manifests.
+
+The repo is read from one tarball download, or from a local git checkout under
+REPO_CHECKOUT_DIR when one exists. Facts are cached by commit SHA, so a repo is
+only downloaded again after it changes.
+"""
+import contextvars
+import io
+import json
+import os
+import re
+import subprocess
+import tarfile
+import tomllib
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+
+from cache_store import CacheStore
+from github_utils import github_download, github_get, resolved_repo, run_on_github_loop
+from metrics import Counter, span
+from rate_limit import current_priority, INTERACTIVE
+from singleflight import SingleFlight
+
+REPO_CHECKOUT_DIR = os.getenv("REPO_CHECKOUT_DIR")
+REPO_HEAD_TTL = float(os.getenv("REPO_HEAD_TTL", 600))
+# How long a guide waits for facts once its README is in hand. Interactive guides
+# only allow a short grace period; warm-ups and refreshes can afford to wait.
+REPO_FACTS_TIMEOUT = float(os.getenv("REPO_FACTS_TIMEOUT", 0.3))
+REPO_FACTS_BACKGROUND_TIMEOUT = float(os.getenv("REPO_FACTS_BACKGROUND_TIMEOUT", 30))
+REPO_TARBALL_MAX_BYTES = int(os.getenv("REPO_TARBALL_MAX_BYTES", 50 * 1024 * 1024))
+MANIFEST_MAX_BYTES = 256 * 1024
+MAX_DEPTH = 2
+MAX_DEPENDENCIES = 15
+
+MANIFESTS = {"package.json", "yarn.lock", "pnpm-lock.yaml", "requirements.txt", "pyproject.toml", "Pipfile",
+             "Podfile", "Package.swift", "build.gradle", "build.gradle.kts", "gradlew", "docker-compose.yml",
+             "docker-compose.yaml", "Dockerfile", "Makefile", "Procfile", ".nvmrc", ".python-version"}
+ENV_FILES = {".env.example", ".env.sample", ".env.template", "env.example", ".env.dist", "example.env"}
+SKIP_DIRS = {"node_modules", "Pods", "vendor", ".git", "build", "dist", "venv", ".venv"}
+NPM_SCRIPTS = ("dev", "start", "build", "test", "migrate", "seed", "lint")
+MAKE_TARGETS = ("setup", "install", "dev", "run", "start", "test", "migrate")
+
+facts_flight = SingleFlight("repo_facts")
+facts_cache = CacheStore("repo_facts")
+repo_heads = CacheStore("repo_heads", default_ttl=REPO_HEAD_TTL)
+_facts_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="repo-facts")
+facts_requests = Counter("onboarding_repo_facts_total", "Repo fact lookups by source.", ("source",))
+
+
+# --- parsing -------------------------------------------------------------
+
+def _wanted(path: str) -> bool:
+    parts = path.split("/")
+    name = parts[-1]
+    return (len(parts) <= MAX_DEPTH and not SKIP_DIRS.intersection(parts[:-1])
+            and (name in MANIFESTS or name in ENV_FILES))
+
+
+def _add(facts: dict, key: str, *values):
+    for value in values:
+        if value and value not in facts[key]:
+            facts[key].append(value)
+
+
+def _deps(facts: dict, source: str, names):
+    names = list(dict.fromkeys(n for n in names if n))
+    if names:
+        facts["dependencies"][source] = names
+
+
+def _parse_package_json(facts, path, text, names):
+    data = json.loads(text)
+    runner = "yarn" if "yarn.lock" in names else "pnpm" if "pnpm-lock.yaml" in names else "npm"
+    prefix = _dir_prefix(path)
+    _add(facts, "commands", f"{prefix}{runner} install")
+    scripts = data.get("scripts") or {}
+    _add(facts, "commands", *(f"{prefix}{runner} run {s}" for s in NPM_SCRIPTS if s in scripts))
+    _deps(facts, path, list(data.get("dependencies") or {}) + list(data.get("devDependencies") or {}))
+    node = (data.get("engines") or {}).get("node")
+    if node:
+        facts["toolchain"]["node"] = node
+
+
+def _parse_requirements(facts, path, text, names):
+    _add(facts, "commands", f"pip install -r {path}")
+    _deps(facts, path, [re.split(r"[<>=!~\[;@ ]", line.strip(), 1)[0] for line in text.splitlines()
+                        if line.strip() and not line.lstrip().startswith(("#", "-"))])
+
+
+def _parse_pyproject(facts, path, text, names):
+    data = tomllib.loads(text)
+    project = data.get("project") or {}
+    poetry = (data.get("tool") or {}).get("poetry") or {}
+    deps = [re.split(r"[<>=!~\[;@ ]", d, 1)[0] for d in project.get("dependencies") or []]
+    deps += [d for d in poetry.get("dependencies") or {} if d != "python"]
+    _deps(facts, path, deps)
+    _add(facts, "commands", "poetry install" if poetry else f"{_dir_prefix(path)}pip install -e .")
+    python = project.get("requires-python") or (poetry.get("dependencies") or {}).get("python")
+    if python:
+        facts["toolchain"]["python"] = python
+
+
+def _parse_pipfile(facts, path, text, names):
+    data = tomllib.loads(text)
+    _deps(facts, path, list(data.get("packages") or {}))
+    _add(facts, "commands", "pipenv install")
+
+
+def _parse_podfile(facts, path, text, names):
+    _add(facts, "commands", "pod install")
+    _deps(facts, path, re.findall(r"^\s*pod\s+['\"]([^'\"]+)['\"]", text, re.M))
+    platform = re.search(r"platform\s+:ios,\s*['\"]([^'\"]+)['\"]", text)
+    if platform:
+        facts["toolchain"]["ios"] = platform.group(1)
+    _add(facts, "notes", "Open the .xcworkspace (not the .xcodeproj) after `pod install`.")
+
+
+def _parse_package_swift(facts, path, text, names):
+    _deps(facts, path, [url.rstrip("/").rsplit("/", 1)[-1].removesuffix(".git")
+                        for url in re.findall(r"\.package\(\s*(?:name:\s*\"[^\"]*\",\s*)?url:\s*\"([^\"]+)\"", text)])
+
+
+def _parse_gradle(facts, path, text, names):
+    deps = re.findall(r"(?:implementation|api|kapt|ksp)\s*\(?\s*['\"]([\w.\-]+):([\w.\-]+)(?::[^'\"]*)?['\"]", text)
+    _deps(facts, path, [f"{group}:{name}" for group, name in deps]
+          + re.findall(r"implementation\s*\(\s*libs\.([\w.]+)\s*\)", text))
+    for key in ("minSdk", "compileSdk", "targetSdk"):
+        match = re.search(rf"{key}(?:Version)?\s*=?\s*(\d+)", text)
+        if match:
+            facts["toolchain"][key] = match.group(1)
+    if "gradlew" in names:
+        _add(facts, "commands", "./gradlew assembleDebug")
+
+
+def _parse_env(facts, path, text, names):
+    facts["env_file"] = facts.get("env_file") or path
+    _add(facts, "env_vars", *re.findall(r"^\s*(?:export\s+)?([A-Z][A-Z0-9_]*)\s*=", text, re.M))
+
+
+def _parse_compose(facts, path, text, names):
+    services = re.search(r"^services:\s*\n((?:[ \t]+.*\n?)*)", text, re.M)
+    if services:
+        _add(facts, "services", *re.findall(r"^[ \t]{2}([\w\-]+):", services.group(1), re.M))
+    _add(facts, "commands", "docker-compose up")
+
+
+def _parse_makefile(facts, path, text, names):
+    targets = re.findall(r"^([A-Za-z][\w\-]*):", text, re.M)
+    _add(facts, "commands", *(f"make {t}" for t in MAKE_TARGETS if t in targets))
+
+
+def _parse_procfile(facts, path, text, names):
+    _add(facts, "commands", *(line.split(":", 1)[1].strip() for line in text.splitlines() if ":" in line))
+
+
+def _parse_version_file(key):
+    def parse(facts, path, text, names):
+        facts["toolchain"][key] = text.strip().splitlines()[0] if text.strip() else None
+    return parse
+
+
+PARSERS = {
+    "package.json": _parse_package_json,
+    "requirements.txt": _parse_requirements,
+    "pyproject.toml": _parse_pyproject,
+    "Pipfile": _parse_pipfile,
+    "Podfile": _parse_podfile,
+    "Package.swift": _parse_package_swift,
+    "build.gradle": _parse_gradle,
+    "build.gradle.kts": _parse_gradle,
+    "docker-compose.yml": _parse_compose,
+    "docker-compose.yaml": _parse_compose,
+    "Makefile": _parse_makefile,
+    "Procfile": _parse_procfile,
+    ".nvmrc": _parse_version_file("node"),
+    ".python-version": _parse_version_file("python"),
+}
+
+
+def _dir_prefix(path: str) -> str:
+    directory = path.rpartition("/")[0]
+    return f"cd {directory} && " if directory else ""
+
+
+def extract_facts(files: dict[str, str]) -> dict:
+    """Deterministic facts from manifest files ({repo-relative path: text})."""
+    facts = {"commands": [], "env_vars": [], "dependencies": {}, "toolchain": {}, "services": [], "notes": []}
+    names = {path.rsplit("/", 1)[-1] for path in files}
+    # Shallow files first and installs before run commands, so the list reads in setup order.
+    order = {name: i for i, name in enumerate(PARSERS)}
+    for path in sorted(files, key=lambda p: (p.count("/"), order.get(p.rsplit("/", 1)[-1], len(order)), p)):
+        name = path.rsplit("/", 1)[-1]
+        parser = _parse_env if name in ENV_FILES else PARSERS.get(name)
+        if parser is None:
+            continue
+        try:
+            parser(facts, path, files[path], names)
+        except (ValueError, tomllib.TOMLDecodeError) as e:
+            print(f"⚠️ Couldn't parse {path}: {e}")
+    facts["toolchain"] = {k: v for k, v in facts["toolchain"].items() if v}
+    return facts
+
+
+def format_facts(facts: dict) -> str:
+    """Compact prompt block for a facts dict; empty if nothing useful was found."""
+    lines = []
+    if facts.get("commands"):
+        lines.append("• Setup/run commands: " + ", ".join(f"`{c}`" for c in facts["commands"]))
+    if facts.get("env_vars"):
+        lines.append(f"• Environment variables ({facts.get('env_file', '.env')}): " + ", ".join(facts["env_vars"]))
+    if facts.get("services"):
+        lines.append("• docker-compose services: " + ", ".join(facts["services"]))
+    if facts.get("toolchain"):
+        lines.append("• Toolchain: " + ", ".join(f"{k} {v}" for k, v in facts["toolchain"].items()))
+    for source, deps in (facts.get("dependencies") or {}).items():
+        more = f" (+{len(deps) - MAX_DEPENDENCIES} more)" if len(deps) > MAX_DEPENDENCIES else ""
+        lines.append(f"• Dependencies in {source}: " + ", ".join(deps[:MAX_DEPENDENCIES]) + more)
+    lines += [f"• {note}" for note in facts.get("notes") or []]
+    if not lines:
+        return ""
+    return f"Facts extracted from the repo's files at commit {facts.get('sha', '')[:7]}:\n" + "\n".join(lines)
+
+
+# --- sources -------------------------------------------------------------
+
+def _tarball_files(data: bytes) -> dict[str, str]:
+    files = {}
+    with tarfile.open(fileobj=io.BytesIO(data), mode="r:gz") as tar:
+        for member in tar:
+            # GitHub tarballs wrap everything in a <owner>-<repo>-<sha>/ directory.
+            path = member.name.split("/", 1)[1] if "/" in member.name else ""
+            if member.isfile() and _wanted(path) and member.size <= MANIFEST_MAX_BYTES:
+                files[path] = tar.extractfile(member).read().decode("utf-8", errors="ignore")
+    return files
+
+
+def _checkout_path(repo: str) -> str | None:
+    if not REPO_CHECKOUT_DIR:
+        return None
+    path = os.path.join(REPO_CHECKOUT_DIR, repo.split("/", 1)[-1])
+    return path if os.path.isdir(os.path.join(path, ".git")) else None
+
+
+def _checkout_sha(path: str) -> str:
+    return subprocess.run(["git", "-C", path, "rev-parse", "HEAD"], capture_output=True, text=True,
+                          check=True).stdout.strip()
+
+
+def _checkout_files(path: str) -> dict[str, str]:
+    files = {}
+    for root, dirs, names in os.walk(path):
+        rel = os.path.relpath(root, path)
+        depth = 0 if rel == "." else rel.count(os.sep) + 1
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS and depth + 1 < MAX_DEPTH]
+        for name in names:
+            relpath = name if rel == "." else f"{rel.replace(os.sep, '/')}/{name}"
+            full = os.path.join(root, name)
+            if _wanted(relpath) and os.path.getsize(full) <= MANIFEST_MAX_BYTES:
+                with open(full, encoding="utf-8", errors="ignore") as f:
+                    files[relpath] = f.read()
+    return files
+
+
+async def _head_sha(repo: str, level: int) -> str | None:
+    sha = repo_heads.get(repo)
+    if sha is None:
+        response = await github_get(f"/repos/{repo}/commits/HEAD", level,
+                                     headers={"Accept": "application/vnd.github.sha"})
+        if response.status_code == 200:
+            sha = response.text.strip()
+        elif response.status_code in (404, 409):
+            # Missing or empty (409) repos are remembered for REPO_HEAD_TTL as "";
+            # rate limits and server errors are not, so the next guide retries.
+            sha = ""
+        else:
+            print(f"⚠️ Couldn't read {repo} HEAD ({response.status_code})")
+            return None
+        repo_heads.set(repo, sha)
+    return sha or None
+
+
+async def _github_facts(repo: str, level: int) -> dict | None:
+    sha = await _head_sha(repo, level)
+    if not sha:
+        return None
+    facts = facts_cache.get(sha)
+    if facts is not None:
+        facts_requests.inc(source="cache")
+        return facts
+    status, data = await github_download(f"/repos/{repo}/tarball/{sha}", REPO_TARBALL_MAX_BYTES, level, timeout=60)
+    if data is None:
+        reason = "over REPO_TARBALL_MAX_BYTES" if status == 200 else status
+        print(f"⚠️ Couldn't download {repo}@{sha[:7]} ({reason})")
+        return None
+    with span("repo_facts_parse"):
+        facts = {**extract_facts(_tarball_files(data)), "sha": sha, "repo": repo}
+    facts_cache.set(sha, facts)
+    facts_requests.inc(source="tarball")
+    return facts
+
+
+def _checkout_facts(path: str, repo: str) -> dict:
+    sha = _checkout_sha(path)
+    facts = facts_cache.get(sha)
+    if facts is not None:
+        facts_requests.inc(source="cache")
+        return facts
+    with span("repo_facts_parse"):
+        facts = {**extract_facts(_checkout_files(path)), "sha": sha, "repo": repo}
+    facts_cache.set(sha, facts)
+    facts_requests.inc(source="checkout")
+    return facts
+
+
+def get_repo_facts(repo: str) -> dict | None:
+    """Facts for "cuappdev/<repo>" at its current HEAD, or None if unavailable."""
+    try:
+        checkout = _checkout_path(repo)
+        if checkout:
+            return _checkout_facts(checkout, repo)
+        level = current_priority()
+        return run_on_github_loop(facts_flight.do_async(repo, _github_facts, repo, level))
+    except Exception as e:
+        print(f"⚠️ Couldn't extract facts for {repo}: {e}")
+        facts_requests.inc(source="error")
+        return None
+
+
+def repo_facts_context(repo_name: str, team: str) -> str:
+    """Prompt block of facts for the repo an (app, team) resolves to; "" if none."""
+    repo = resolved_repo(repo_name, team)
+    facts = get_repo_facts(repo) if repo else None
+    return format_facts(facts) if facts else ""
+
+
+def prefetch_facts(repo_name: str, team: str) -> Future:
+    """Starts repo_facts_context in the background (e.g. while the README downloads)."""
+    return _facts_pool.submit(contextvars.copy_context().run, repo_facts_context, repo_name, team)
+
+
+def wait_for_facts(future: Future, timeout: float = None) -> str:
+    """The prefetched facts block, or "" if it isn't ready in time.
+
+    Call it once the README has arrived. A slow first download keeps going in
+    the background and is cached by SHA, so the next guide for the repo gets
+    the facts.
+    """
+    if timeout is None:
+        timeout = REPO_FACTS_TIMEOUT if current_priority() == INTERACTIVE else REPO_FACTS_BACKGROUND_TIMEOUT
+    try:
+        return future.result(timeout=timeout)
+    except TimeoutError:
+        facts_requests.inc(source="timeout")
+        return ""
@@ -0,0 +1,134 @@
+"""(app, team) -> GitHub repo resolution from utils/apps.json and an optional org listing snapshot.
+
+Usage:
+    python repo_index.py --refresh          # snapshot the cuappdev org's repos to utils/repo_listing.json
+    python repo_index.py eatery backend     # show how a lookup resolves
+
+With a listing snapshot the index is authoritative: an (app, team) it can't
+resolve has no repo, so fetch_readme answers without probing GitHub at all.
+"""
+import argparse
+import json
+import os
+import time
+
+from config import ALLOWED_APPS, ALLOWED_TEAMS, load_apps
+
+GITHUB_ORG = "cuappdev"
+REPO_LISTING_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "utils", "repo_listing.json")
+
+# Apps whose repos don't share the app's name.
+REPO_PREFIXES = {"scooped": "scoop"}
+# Repo name segments that mean a team's codebase, most preferred first.
+TEAM_SUFFIXES = {
+    "backend": ("backend",),
+    "ios": ("ios",),
+    "android": ("android", "compose"),
+    "frontend": ("frontend", "web"),
+}
+NO_TEAM_ORDER = ("", "-backend", "-ios", "-android", "-frontend")
+
+
+class RepoIndex:
+    """Precomputed (app, team) -> "cuappdev/<repo>" table over a set of known repo names.
+
+    `authoritative` means the names cover the whole org (a listing snapshot was
+    loaded), so a miss is final rather than a reason to probe.
+    """
+
+    def __init__(self, repos, authoritative: bool = False, apps=()):
+        self.repos = frozenset(repos)
+        self.authoritative = authoritative
+        self._table = {}
+        for app in apps:
+            for team in (None, *ALLOWED_TEAMS):
+                self.resolve(app, team)
+
+    def __len__(self) -> int:
+        return len(self.repos)
+
+    def resolve(self, app: str, team: str = None) -> str | None:
+        key = (app.lower(), team.lower() if team else None)
+        try:
+            return self._table[key]
+        except KeyError:
+            name = self._resolve(*key)
+            self._table[key] = f"{GITHUB_ORG}/{name}" if name else None
+            return self._table[key]
+
+    def _resolve(self, app: str, team: str | None) -> str | None:
+        prefix = REPO_PREFIXES.get(app, app)
+        if team is None:
+            return next((prefix + s for s in NO_TEAM_ORDER if prefix + s in self.repos), None)
+        suffixes = TEAM_SUFFIXES.get(team)
+        if suffixes is None:
+            # Non-dev teams read the app's umbrella repo when there is one.
+            return prefix if prefix in self.repos else None
+        for suffix in suffixes:
+            if f"{prefix}-{suffix}" in self.repos:
+                return f"{prefix}-{suffix}"
+        # Variants such as all-in-ios-swiftui: the shortest name with the team segment.
+        variants = sorted((r for r in self.repos if r.startswith(prefix + "-")
+                           and set(r[len(prefix) + 1:].split("-")) & set(suffixes)), key=len)
+        if variants:
+            return variants[0]
+        return prefix if prefix in self.repos else None
+
+
+def load_listing(path: str = REPO_LISTING_FILE) -> list[str] | None:
+    try:
+        with open(path) as f:
+            return json.load(f)["repos"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def build_index(listing_path: str = REPO_LISTING_FILE) -> RepoIndex:
+    """Index over apps.json plus the org listing snapshot, if one has been saved."""
+    repos = {repo for entry in load_apps().values() for repo in entry["repos"].values()}
+    listing = load_listing(listing_path)
+    if listing is not None:
+        repos.update(listing)
+    apps = set(ALLOWED_APPS) | set(load_apps())
+    return RepoIndex(repos, authoritative=listing is not None, apps=apps)
+
+
+def refresh_listing(path: str = REPO_LISTING_FILE) -> int:
+    """Snapshots every non-archived repo in the org; returns how many were saved."""
+    import httpx
+    headers = {"Accept": "application/vnd.github+json"}
+    if os.getenv("GITHUB_TOKEN"):
+        headers["Authorization"] = f"token {os.getenv('GITHUB_TOKEN')}"
+    base = os.getenv("GITHUB_API_URL", "https://api.github.com")
+    repos, page = [], 1
+    with httpx.Client(base_url=base, headers=headers, timeout=30) as client:
+        while True:
+            response = client.get(f"/orgs/{GITHUB_ORG}/repos", params={"per_page": 100, "page": page})
+            response.raise_for_status()
+            batch = response.json()
+            repos += [r["name"] for r in batch if not r.get("archived")]
+            if len(batch) < 100:
+                break
+            page += 1
+    with open(path, "w") as f:
+        json.dump({"org": GITHUB_ORG, "fetched_at": int(time.time()), "repos": sorted(repos)}, f, indent=2)
+    return len(repos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--refresh", action="store_true", help="re-download the org repo listing")
+    parser.add_argument("app", nargs="?")
+    parser.add_argument("team", nargs="?")
+    args = parser.parse_args()
+
+    if args.refresh:
+        print(f"📦 Saved {refresh_listing()} repos to {REPO_LISTING_FILE}")
+    index = build_index()
+    print(f"🗂️ {len(index)} known repos ({'authoritative' if index.authoritative else 'apps.json only'})")
+    if args.app:
+        print(f"{args.app} {args.team or ''} -> {index.resolve(args.app, args.team) or 'no repo'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+SESSION_TTL = float(os.getenv("SESSION_TTL", 6 * 3600))
+SESSION_MAX = int(os.getenv("SESSION_MAX", 10_000))
+
+
+class ReadmePool:
+    """Content-addressed, reference-counted README storage shared by all sessions."""
+
+    def __init__(self):
+        self._texts = {}
+        self._refs = {}
+        self._lock = threading.Lock()
+
+    def intern(self, text: str) -> str:
+        key = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        with self._lock:
+            if key not in self._texts:
+                self._texts[key] = text
+                self._refs[key] = 0
+            self._refs[key] += 1
+        return key
+
+    def release(self, key: str):
+        with self._lock:
+            if key not in self._refs:
+                return
+            self._refs[key] -= 1
+            if self._refs[key] <= 0:
+                del self._refs[key]
+                del self._texts[key]
+
+    def get(self, key: str) -> str | None:
+        return self._texts.get(key)
+
+    def __len__(self):
+        return len(self._texts)
+
+    def nbytes(self) -> int:
+        return sum(sys.getsizeof(t) for t in self._texts.values())
+
+
+readme_pool = ReadmePool()
+
+
+class SessionState:
+    """One user's onboarding state.
+
+    Slotted to keep per-session overhead small; the README lives in readme_pool
+    and is referenced by hash. Supports the dict-style get/update/[] access the
+    handlers already use.
+    """
+
+    __slots__ = ("app", "team", "experience", "level", "phase", "action",
+                 "history", "readme_key", "last_seen", "extra")
+    FIELDS = ("app", "team", "experience", "level", "phase", "action", "history")
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            object.__setattr__(self, name, None)
+        self.last_seen = time.monotonic()
+        self.update(values)
+
+    @property
+    def readme(self) -> str | None:
+        return readme_pool.get(self.readme_key) if self.readme_key else None
+
+    @readme.setter
+    def readme(self, text: str | None):
+        old = self.readme_key
+        self.readme_key = readme_pool.intern(text) if text is not None else None
+        if old:
+            readme_pool.release(old)
+
+    def release(self):
+        if self.readme_key:
+            readme_pool.release(self.readme_key)
+            self.readme_key = None
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key == "readme" or key in self.FIELDS:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key) -> bool:
+        return self.get(key) is not None
+
+    def __bool__(self) -> bool:
+        return any(getattr(self, f) is not None for f in self.FIELDS) or self.readme_key is not None
+
+    def get(self, key, default=None):
+        if key == "readme" or key in self.FIELDS:
+            value = getattr(self, key)
+        else:
+            value = (self.extra or {}).get(key)
+        return default if value is None else value
+
+    def update(self, values: dict):
+        for key, value in values.items():
+            self[key] = value
+
+    def to_dict(self) -> dict:
+        data = {f: getattr(self, f) for f in self.FIELDS if getattr(self, f) is not None}
+        data.update(self.extra or {})
+        return data
+
+
+class SessionStore:
+    """Bounded user_id -> SessionState map with idle-TTL and LRU eviction."""
+
+    def __init__(self, ttl: float = SESSION_TTL, max_sessions: int = SESSION_MAX):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.evicted = 0
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict(self, now: float):
+        # Sessions are kept in last-touched order, so expired ones are at the front.
+        while self._sessions:
+            user_id, state = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and now - state.last_seen < self.ttl:
+                break
+            del self._sessions[user_id]
+            state.release()
+            self.evicted += 1
+
+    def get(self, user_id, default=None):
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            state = self._sessions.get(user_id)
+            if state is None:
+                return default
+            state.last_seen = now
+            self._sessions.move_to_end(user_id)
+            return state
+
+    def __getitem__(self, user_id) -> SessionState:
+        state = self.get(user_id)
+        if state is None:
+            raise KeyError(user_id)
+        return state
+
+    def __setitem__(self, user_id, state):
+        if not isinstance(state, SessionState):
+            state = SessionState(**state)
+        now = time.monotonic()
+        state.last_seen = now
+        with self._lock:
+            old = self._sessions.pop(user_id, None)
+            if old is not None and old is not state:
+                old.release()
+            self._sessions[user_id] = state
+            self._evict(now)
+
+    def pop(self, user_id, default=None):
+        with self._lock:
+            state = self._sessions.pop(user_id, None)
+        if state is None:
+            return default
+        state.release()
+        return state
+
+    def __contains__(self, user_id) -> bool:
+        return self.get(user_id) is not None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+    def memory_stats(self) -> dict:
+        """Approximate memory held by sessions and the shared README pool, in bytes."""
+        with self._lock:
+            states = list(self._sessions.values())
+        session_bytes = 0
+        for state in states:
+            session_bytes += sys.getsizeof(state)
+            if state.history:
+                session_bytes += sys.getsizeof(state.history)
+                session_bytes += sum(sys.getsizeof(t["user"]) + sys.getsizeof(t["bot"]) for t in state.history)
+                session_bytes += sys.getsizeof(getattr(state.history, "summary", ""))
+        return {
+            "sessions": len(states),
+            "evicted": self.evicted,
+            "session_bytes": session_bytes,
+            "readmes": len(readme_pool),
+            "readme_bytes": readme_pool.nbytes(),
+        }
@@ -0,0 +1,71 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one execution.
+
+    The first caller for a key (the leader) does the work; callers arriving
+    while it is in flight wait on the same future and get the same result or
+    exception. `leaders` counts real executions, `coalesced` counts calls that
+    were saved by waiting on one.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.leaders = 0
+        self.coalesced = 0
+        self._calls = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+
+    def claim(self, key) -> tuple[Future, bool]:
+        """Returns (future, is_leader). The leader must call resolve(key, ...)."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self.leaders += 1
+            return future, True
+
+    def resolve(self, key, result=None, error: BaseException = None):
+        with self._lock:
+            future = self._calls.pop(key)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key, fn, *args, **kwargs):
+        future, leader = self.claim(key)
+        if not leader:
+            return future.result()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self.resolve(key, error=e)
+            raise
+        self.resolve(key, result)
+        return result
+
+    async def do_async(self, key, fn, *args, **kwargs):
+        """Coroutine flavour of do(); callers must share one event loop."""
+        with self._lock:
+            task = self._tasks.get(key)
+            if task is not None:
+                self.coalesced += 1
+            else:
+                task = asyncio.ensure_future(fn(*args, **kwargs))
+                self._tasks[key] = task
+                self.leaders += 1
+                task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        # Shield so a cancelled waiter doesn't cancel the work others wait on.
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {"name": self.name, "leaders": self.leaders, "coalesced": self.coalesced,
+                "in_flight": len(self._calls) + len(self._tasks)}
@@ -0,0 +1,181 @@
+"""Single-pass Markdown -> Slack mrkdwn renderer for Gemini output."""
+import re
+
+# One alternation for every inline construct; re.sub walks the line once.
+_INLINE = re.compile(
+    r"(?P<code>`[^`\n]+`)"
+    r"|\*\*(?P<bold>[^*\n]+?)\*\*"
+    r"|__(?P<ubold>[^_\n]+?)__"
+    r"|\[(?P<label>[^\]\n]+)\]\((?P<url>[^)\s]+)\)"
+    r"|(?P<stray>\*\*)"
+    r"|(?P<spaces> {2,})"
+)
+_LINE = re.compile(
+    r"(?P<fence>\s*```)"
+    r"|(?P<heading>#{1,6})\s+(?P<htext>.*?)\s*#*\s*$"
+    r"|(?P<bindent>\s*)[-*+•]\s+(?P<btext>.*)$"
+    r"|(?P<number>\s*\d+[.)]\s+.*)$"
+)
+_BOLD_LINE = re.compile(r"^\*[^*\n]+\*$")
+_CODE_LINE = re.compile(r"^`[^`\n]+`$")
+
+SLACK_SECTION_LIMIT = 3000
+# Slack rejects messages with more blocks than this.
+SLACK_MAX_BLOCKS = 50
+
+
+def _inline_sub(match: re.Match) -> str:
+    kind = match.lastgroup
+    if kind == "code":
+        return match.group(0)
+    if kind == "bold":
+        return f"*{match.group('bold').strip()}*"
+    if kind == "ubold":
+        return f"*{match.group('ubold').strip()}*"
+    if kind == "url":
+        return f"<{match.group('url')}|{match.group('label')}>"
+    if kind == "stray":
+        return ""
+    return " "
+
+
+def _inline(text: str) -> str:
+    return _INLINE.sub(_inline_sub, text)
+
+
+def _render_line(line: str) -> tuple[str, str]:
+    """Returns (kind, rendered) for one non-fence, non-blank line."""
+    match = _LINE.match(line)
+    if match and match.group("heading"):
+        title = match.group("htext").replace("*", "").strip()
+        return "block", f"*{_inline(title)}*"
+    if match and match.group("btext") is not None:
+        return "block", f"{match.group('bindent')}• {_inline(match.group('btext')).strip()}"
+    if match and match.group("number"):
+        indent = line[:len(line) - len(line.lstrip())]
+        return "block", indent + _inline(line.strip()).strip()
+    rendered = _inline(line.strip()).strip()
+    if not rendered:
+        return "blank", ""
+    if _BOLD_LINE.match(rendered) or _CODE_LINE.match(rendered):
+        return "block", rendered
+    return "text", rendered
+
+
+def markdown_to_mrkdwn(text: str) -> str:
+    """Converts Gemini Markdown to Slack mrkdwn in one pass over the lines.
+
+    Code (inline spans and ``` fences) is copied verbatim. Headings and
+    bold-only lines become *bold* section titles, -/*/+ bullets become •, links
+    become <url|label>, and stray ** markers are dropped. Section titles, list
+    items and code get a blank line around them; plain prose keeps its breaks.
+    """
+    out = []
+    prev_kind = None
+    paragraph_break = False
+    fence = None
+
+    for line in text.splitlines():
+        if fence is not None:
+            fence.append(line)
+            if line.strip().startswith("```"):
+                fence[-1] = "```"
+                rendered, kind, fence = "\n".join(fence), "block", None
+            else:
+                continue
+        elif line.lstrip().startswith("```"):
+            # Slack ignores language tags, so the opening fence is bare.
+            fence = ["```"]
+            continue
+        else:
+            if not line.strip():
+                paragraph_break = prev_kind is not None
+                continue
+            kind, rendered = _render_line(line)
+            if kind == "blank":
+                continue
+
+        if prev_kind is not None:
+            loose = paragraph_break or kind == "block" or prev_kind == "block"
+            out.append("\n\n" if loose else "\n")
+        out.append(rendered)
+        prev_kind, paragraph_break = kind, False
+
+    if fence is not None:
+        # Unterminated fence (e.g. a truncated response): close it so Slack renders it.
+        if prev_kind is not None:
+            out.append("\n\n")
+        out.append("\n".join(fence + ["```"]))
+    return "".join(out).strip()
+
+
+def mrkdwn_to_blocks(mrkdwn: str) -> list[dict]:
+    """Splits rendered mrkdwn into Block Kit sections, one per titled section.
+
+    Sections longer than Slack's 3000-character limit are split on paragraph
+    boundaries; a single paragraph that is still too long is split by lines,
+    with a code fence closed and reopened around each piece.
+    """
+    sections, current = [], []
+    for para in _paragraphs(mrkdwn):
+        if _BOLD_LINE.match(para) and current:
+            sections.append(current)
+            current = []
+        current.append(para)
+    if current:
+        sections.append(current)
+
+    blocks = []
+    for paras in sections:
+        text = ""
+        for para in (piece for para in paras for piece in _split_long(para)):
+            if text and len(text) + len(para) + 2 > SLACK_SECTION_LIMIT:
+                blocks.append(_section(text))
+                text = ""
+            text = f"{text}\n\n{para}" if text else para
+        if text:
+            blocks.append(_section(text))
+    return blocks
+
+
+def _paragraphs(mrkdwn: str) -> list[str]:
+    paras, current, in_fence = [], [], False
+    for para in mrkdwn.split("\n\n"):
+        current.append(para)
+        if para.count("```") % 2:
+            in_fence = not in_fence
+        if not in_fence:
+            paras.append("\n\n".join(current))
+            current = []
+    if current:
+        paras.append("\n\n".join(current))
+    return paras
+
+
+def _split_long(para: str) -> list[str]:
+    if len(para) <= SLACK_SECTION_LIMIT:
+        return [para]
+    lines = para.split("\n")
+    fenced = lines[0].startswith("```") and lines[-1].strip() == "```"
+    opener, lines = (lines[0], lines[1:-1]) if fenced else ("", lines)
+    room = SLACK_SECTION_LIMIT - (len(opener) + 5 if fenced else 0)
+    pieces, current = [], ""
+    for line in lines:
+        while len(line) > room:
+            # A single line longer than a section: hard-wrap it.
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(line[:room])
+            line = line[room:]
+        if current and len(current) + len(line) + 1 > room:
+            pieces.append(current)
+            current = ""
+        current = f"{current}\n{line}" if current else line
+    if current:
+        pieces.append(current)
+    return [f"{opener}\n{piece}\n```" for piece in pieces] if fenced else pieces
+
+
+def _section(text: str) -> dict:
+    return {"type": "section", "text": {"type": "mrkdwn", "text": text[:SLACK_SECTION_LIMIT]}}
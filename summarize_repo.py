@@ -1,25 +1,57 @@
 import os
-import google.generativeai as genai
 from dotenv import load_dotenv
-from github_utils import fetch_readme
-import json
-import re
+from github_utils import fetch_readme, readme_found
+from cache_store import CacheStore
+from singleflight import SingleFlight
+from readme_index import retrieve_context
+from slack_format import markdown_to_mrkdwn
+from metrics import span, record_error, stage_seconds, llm_tokens
+from rate_limit import scheduler
+from answer_cache import AnswerCache
+from readme_prep import prepare_readme
+from repo_facts import prefetch_facts, wait_for_facts
+from config import TECH_TEAMS
+import hashlib
+import itertools
+import threading
+import time
 
 CACHE_FILE = "summaries_cache.json"
+SUMMARY_CACHE_TTL = float(os.getenv("SUMMARY_CACHE_TTL", 0)) or None
+# Dev-team guides built before their repo facts were ready expire sooner, so
+# the next request or warm-up rebuilds them with the facts.
+SUMMARY_NO_FACTS_TTL = float(os.getenv("SUMMARY_NO_FACTS_TTL", 600))
 
-def load_cache():
-    if os.path.exists(CACHE_FILE):
-        with open(CACHE_FILE, "r") as f:
-            return json.load(f)
-    return {}
+summary_cache = CacheStore("summaries", default_ttl=SUMMARY_CACHE_TTL, seed_file=CACHE_FILE)
+summary_flight = SingleFlight("summarize_repo")
+# cache_key -> sha256 of the README a cached summary was generated from.
+summary_sources = CacheStore("summary_sources", default_ttl=SUMMARY_CACHE_TTL)
+followup_cache = AnswerCache()
 
-def save_cache(cache):
-    with open(CACHE_FILE, "w") as f:
-        json.dump(cache, f, indent=2)
+def readme_digest(readme: str) -> str:
+    return hashlib.sha256(readme.encode("utf-8")).hexdigest()
+
+def _cache_summary(cache_key: str, role: str, summary: str, readme: str, facts: str):
+    ttl = SUMMARY_NO_FACTS_TTL if role.lower() in TECH_TEAMS and not facts else SUMMARY_CACHE_TTL
+    summary_cache.set(cache_key, summary, ttl=ttl)
+    summary_sources.set(cache_key, readme_digest(readme), ttl=ttl)
 
 load_dotenv()
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-model = genai.GenerativeModel("models/gemini-2.5-flash")
+# Built on first use: importing google.generativeai alone takes most of a cold start.
+model = None
+_model_lock = threading.Lock()
+
+
+def get_model():
+    """The shared Gemini model, created (and the SDK imported) on first call."""
+    global model
+    if model is None:
+        with _model_lock:
+            if model is None:
+                import google.generativeai as genai
+                genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+                model = genai.GenerativeModel("models/gemini-2.5-flash")
+    return model
 
 FIGMA_LINKS = {
     "default": "https://www.figma.com/files/team/642125268638133075/all-projects?fuid=1419832257768926711",
@@ -37,38 +69,100 @@ FIGMA_LINKS = {
 
 def clean_markdown_artifacts(text: str) -> str:
     """Clean up markdown formatting for Slack compatibility and improve readability."""
-    code_blocks = []
-    def save_code(match):
-        code_blocks.append(match.group(0))
-        return f"___CODE_BLOCK_{len(code_blocks)-1}___"
-    
-    text = re.sub(r'`[^`]+`', save_code, text)
-    text = re.sub(r'\*\*([^\*]+?)\*\*', r'*\1*', text)
-    text = re.sub(r'\*\*\s+', ' ', text)
-    text = re.sub(r'\s+\*\*', ' ', text)
-    text = re.sub(r'\*\*', '', text)
-    text = re.sub(r' +', ' ', text)
-    text = re.sub(r'([^\n])\n(\*[📱🛠️🔑▶️📚🎨🔗👥])', r'\1\n\n\2', text)
-    text = re.sub(r'(\*[📱🛠️🔑▶️📚🎨🔗👥][^\n]+\*)\n([^\n])', r'\1\n\n\2', text)
-    text = re.sub(r'([^\n])\n(\d+\.)', r'\1\n\n\2', text)
-    text = re.sub(r'(\d+\.[^\n]+)\n([^\d\n•])', r'\1\n\n\2', text)
-    text = re.sub(r'([^\n•])\n(•)', r'\1\n\n\2', text)
-    text = re.sub(r'(•[^\n]+)\n([^\n•\d])', r'\1\n\n\2', text)
-    text = re.sub(r'([^\n`])\n(`[^`]+`)\n', r'\1\n\n\2\n\n', text)
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    for i, code in enumerate(code_blocks):
-        text = text.replace(f"___CODE_BLOCK_{i}___", code)
-    
-    return text.strip()
-
-def summarize_repo(repo_name: str, role: str, experience: str = "beginner") -> str:
-    figma_link = FIGMA_LINKS.get(repo_name.lower().split("-")[0], FIGMA_LINKS["default"])
-    cache = load_cache()
-    cache_key = f"{repo_name}-{role}-{experience}"
-    if cache_key in cache:
-        return cache[cache_key]
-
-    readme = fetch_readme(repo_name, role)
+    return markdown_to_mrkdwn(text)
+
+class MarkdownStreamCleaner:
+    """Runs clean_markdown_artifacts on streamed text one finished block at a time.
+
+    A block is complete once a blank line follows it (and it is not inside an
+    open ``` fence), so already-cleaned blocks are never re-processed.
+    """
+
+    def __init__(self):
+        self.raw = ""
+        self._pending = ""
+        self._blocks = []
+
+    def feed(self, chunk: str) -> str:
+        self.raw += chunk
+        self._pending += chunk
+        cut = self._pending.rfind("\n\n")
+        if cut != -1 and self._pending[:cut].count("```") % 2 == 0:
+            done, self._pending = self._pending[:cut], self._pending[cut + 2:]
+            cleaned = clean_markdown_artifacts(done)
+            if cleaned:
+                self._blocks.append(cleaned)
+        return self.text()
+
+    def text(self) -> str:
+        tail = clean_markdown_artifacts(self._pending)
+        return "\n\n".join(self._blocks + ([tail] if tail else []))
+
+def _figma_link(repo_name: str) -> str:
+    return FIGMA_LINKS.get(repo_name.lower().split("-")[0], FIGMA_LINKS["default"])
+
+def _record_usage(response, prompt: str, text: str):
+    """Counts tokens from Gemini's usage metadata, estimating ~4 chars/token if absent."""
+    usage = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", None) if usage else None
+    output_tokens = getattr(usage, "candidates_token_count", None) if usage else None
+    llm_tokens.inc(prompt_tokens or len(prompt) // 4, kind="prompt")
+    llm_tokens.inc(output_tokens or len(text) // 4, kind="response")
+
+def _generate_text(prompt: str) -> str:
+    with span("gemini_generate"):
+        response = scheduler.call("gemini", get_model().generate_content, prompt)
+        text = response.text.strip()
+    _record_usage(response, prompt, text)
+    with span("markdown_clean"):
+        return clean_markdown_artifacts(text)
+
+def _open_stream(prompt: str):
+    """Starts a streaming call and waits for its first chunk, so rate-limit errors surface here."""
+    stream = iter(get_model().generate_content(prompt, stream=True))
+    try:
+        first = next(stream)
+    except StopIteration:
+        return iter(())
+    return itertools.chain([first], stream)
+
+def _stream_text(prompt: str):
+    """Yields cleaned text snapshots from a streaming Gemini call; the last one is final."""
+    cleaner = MarkdownStreamCleaner()
+    # Only time spent waiting on Gemini counts, not the consumer's Slack updates.
+    generating, chunk, first = 0.0, None, True
+    start = time.perf_counter()
+    stream = scheduler.call("gemini", _open_stream, prompt)
+    while True:
+        try:
+            chunk = next(stream)
+        except StopIteration:
+            break
+        finally:
+            generating += time.perf_counter() - start
+        if first:
+            stage_seconds.observe(generating, stage="gemini_first_token")
+            first = False
+        try:
+            piece = chunk.text
+        except ValueError:
+            # Chunks without text parts (e.g. safety metadata) carry nothing to show.
+            piece = None
+        if piece:
+            with span("markdown_clean"):
+                snapshot = cleaner.feed(piece)
+            yield snapshot
+        start = time.perf_counter()
+    stage_seconds.observe(generating, stage="gemini_generate")
+    _record_usage(chunk, prompt, cleaner.raw)
+    with span("markdown_clean"):
+        final = clean_markdown_artifacts(cleaner.raw.strip())
+    yield final
+
+def build_summary_prompt(repo_name: str, role: str, experience: str, readme: str, facts: str = "") -> str:
+    figma_link = _figma_link(repo_name)
+    # Badges, images, changelogs etc. cost tokens without helping the guide.
+    readme = prepare_readme(readme, role)
     role_lower = role.lower()
 
     if any(x in role_lower for x in ["backend", "android", "ios", "frontend"]):
@@ -78,6 +172,10 @@ def summarize_repo(repo_name: str, role: str, experience: str = "beginner") -> s
             experience_context = "They have some {role} experience, so focus on project-specific setup."
         else:
             experience_context = "They are experienced with {role}, so be concise and focus on unique project requirements."
+        facts_context = ""
+        if facts:
+            facts_context = ("\nThe facts below were parsed from the repo's manifest files. Use these exact commands "
+                             f"and variable names instead of guessing.\n\n{facts}\n")
         
         prompt = f"""
 You are an onboarding assistant for Cornell AppDev.
@@ -117,7 +215,7 @@ Format your response as follows:
 Be specific with commands (e.g., `npm install`, `pod install`, `python manage.py runserver`).
 If the README mentions dependencies, list them clearly.
 If setup steps are unclear in the README, note what information is missing.
-
+{facts_context}
 README:
 {readme}
 """
@@ -153,19 +251,134 @@ Keep it warm, welcoming, and actionable.
 README:
 {readme}
 """
+    return prompt
+
+class SummaryError(Exception):
+    """Raised by generate_summary when a guide couldn't be generated."""
+
+
+def _fetch_sources(repo_name: str, role: str) -> tuple[str, str]:
+    """README plus, for dev teams, setup facts from the repo's manifests (fetched alongside).
+
+    Raises SummaryError if the README couldn't be found, so the "not found"
+    message is never summarized into a guide and cached.
+    """
+    facts = prefetch_facts(repo_name, role.lower()) if role.lower() in TECH_TEAMS else None
+    readme = fetch_readme(repo_name, role)
+    if not readme_found(readme):
+        raise SummaryError(readme)
+    return readme, wait_for_facts(facts) if facts else ""
+
+def generate_summary(repo_name: str, role: str, experience: str = "beginner", refresh: bool = False) -> str:
+    """Returns the onboarding guide, generating it unless cached; raises SummaryError on failure.
+
+    refresh=True regenerates even if a guide is cached.
+    """
+    cache_key = f"{repo_name}-{role}-{experience}"
+    if not refresh:
+        cached = summary_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    # Concurrent requests for the same guide wait on a single generation.
+    return summary_flight.do(cache_key, _generate_summary, repo_name, role, experience, cache_key, refresh)
+
+def summarize_repo(repo_name: str, role: str, experience: str = "beginner", refresh: bool = False) -> str:
+    """generate_summary for chat replies: a failure comes back as a message to show the user."""
     try:
-        response = model.generate_content(prompt)
-        summary = response.text.strip()
-        summary = clean_markdown_artifacts(summary)
-        cache[cache_key] = summary
-        save_cache(cache)
-        return summary
-    except Exception as e:
+        return generate_summary(repo_name, role, experience, refresh)
+    except SummaryError as e:
         return f"Error summarizing repo: {e}"
 
-def answer_followup(user_query: str, repo_name: str, role: str, readme: str) -> str:
-    """Handles follow-up questions using repo context."""
-    
+def _generate_summary(repo_name: str, role: str, experience: str, cache_key: str, refresh: bool = False) -> str:
+    if not refresh:
+        cached = summary_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    try:
+        readme, facts = _fetch_sources(repo_name, role)
+    except SummaryError:
+        raise
+    except Exception as e:
+        raise SummaryError(f"couldn't fetch the README: {e}") from e
+    with span("prompt_build"):
+        prompt = build_summary_prompt(repo_name, role, experience, readme, facts)
+    try:
+        summary = _generate_text(prompt)
+    except Exception as e:
+        raise SummaryError(str(e)) from e
+    _cache_summary(cache_key, role, summary, readme, facts)
+    return summary
+
+def stream_summary(repo_name: str, role: str, experience: str = "beginner", sources: dict = None):
+    """Streaming summarize_repo: yields partial guides, caching the complete one at the end.
+
+    If this call fetches the README, it's stored in `sources["readme"]` so the
+    caller doesn't have to fetch it again.
+    """
+    cache_key = f"{repo_name}-{role}-{experience}"
+    cached = summary_cache.get(cache_key)
+    if cached is not None:
+        yield cached
+        return
+
+    future, leader = summary_flight.claim(cache_key)
+    if not leader:
+        # Someone is already generating this guide; show theirs when it lands.
+        try:
+            yield future.result()
+        except Exception as e:
+            yield f"Error summarizing repo: {e}"
+        return
+
+    # The previous leader may have cached the guide between our check and claim.
+    cached = summary_cache.get(cache_key)
+    if cached is not None:
+        summary_flight.resolve(cache_key, cached)
+        yield cached
+        return
+
+    summary, failure = None, None
+    try:
+        try:
+            readme, facts = _fetch_sources(repo_name, role)
+        except SummaryError:
+            raise
+        except Exception as e:
+            # Already counted under readme_resolve by fetch_readme's span; not a Gemini error.
+            raise SummaryError(f"couldn't fetch the README: {e}") from e
+        if sources is not None:
+            sources["readme"] = readme
+        with span("prompt_build"):
+            prompt = build_summary_prompt(repo_name, role, experience, readme, facts)
+        for summary in _stream_text(prompt):
+            yield summary
+        if not summary:
+            record_error("gemini_generate")
+            raise SummaryError("the model returned an empty guide")
+        _cache_summary(cache_key, role, summary, readme, facts)
+    except SummaryError as e:
+        failure = e
+    except Exception as e:
+        record_error("gemini_generate")
+        failure = SummaryError(str(e))
+    except BaseException:
+        # Generator closed early; followers must not hang on a result that never comes.
+        failure = SummaryError("summary stream was abandoned")
+        raise
+    finally:
+        if failure is not None:
+            summary_flight.resolve(cache_key, error=failure)
+        else:
+            summary_flight.resolve(cache_key, summary)
+    if failure is not None:
+        yield f"Error summarizing repo: {failure}"
+
+def build_followup_prompt(user_query: str, repo_name: str, role: str, readme: str) -> str:
+    figma_link = _figma_link(repo_name)
+    # Only the README sections relevant to the question go into the prompt.
+    readme_context = retrieve_context(readme, user_query)
     prompt = f"""
 You are Cornell AppDev's onboarding assistant helping a {role} member on the {repo_name} project.
 Answer their question conversationally and concisely using the README context.
@@ -177,7 +390,7 @@ Guidelines:
 - Use code formatting for commands (e.g., `npm install`)
 
 Special responses:
-- If they ask for Figma/design: Share {FIGMA_LINK}
+- If they ask for Figma/design: Share {figma_link}
 - If they ask about dependencies: List them clearly from the README
 - If they ask about environment variables: Specify which ones and where to get them
 - If they're stuck on setup: Break down the problematic step
@@ -186,12 +399,43 @@ User's question:
 {user_query}
 
 README context:
-{readme}
+{readme_context}
 """
+    return prompt
+
+def _followup_key(repo_name: str, role: str, readme: str) -> tuple:
+    return repo_name, role, readme_digest(readme)
+
+def answer_followup(user_query: str, repo_name: str, role: str, readme: str) -> str:
+    """Handles follow-up questions using repo context."""
+    repo_key = _followup_key(repo_name, role, readme)
+    cached = followup_cache.get(repo_key, user_query)
+    if cached is not None:
+        return cached
+    with span("prompt_build"):
+        prompt = build_followup_prompt(user_query, repo_name, role, readme)
     try:
-        response = model.generate_content(prompt)
-        answer = response.text.strip()
-        answer = clean_markdown_artifacts(answer)
+        answer = _generate_text(prompt)
+        followup_cache.put(repo_key, user_query, answer)
         return answer
     except Exception as e:
         return f"⚠️ Error answering your question: {e}\nTry rephrasing or reach out to your team lead."
+
+def stream_followup(user_query: str, repo_name: str, role: str, readme: str):
+    """Streaming answer_followup: yields partial answers as Gemini produces them."""
+    repo_key = _followup_key(repo_name, role, readme)
+    cached = followup_cache.get(repo_key, user_query)
+    if cached is not None:
+        yield cached
+        return
+    with span("prompt_build"):
+        prompt = build_followup_prompt(user_query, repo_name, role, readme)
+    try:
+        answer = None
+        for answer in _stream_text(prompt):
+            yield answer
+        if answer:
+            followup_cache.put(repo_key, user_query, answer)
+    except Exception as e:
+        record_error("gemini_generate")
+        yield f"⚠️ Error answering your question: {e}\nTry rephrasing or reach out to your team lead."
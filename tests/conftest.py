@@ -0,0 +1,6 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Tests import the bot's flat modules and reuse the labelled data in benchmarks/.
+sys.path[:0] = [ROOT, os.path.join(ROOT, "benchmarks")]
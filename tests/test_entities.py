@@ -0,0 +1,33 @@
+import pytest
+
+from bench_entities import CASES
+from entities import extract_entities
+
+# Inflected words that used to fuzzy-match the app they start with.
+FALSE_POSITIVES = [
+    "onboard me, I scored well on the ios test",
+    "get started with scores",
+    "the app volumes are high",
+    "I am a hustler",
+    "I am feeling uplifted",
+]
+
+
+@pytest.mark.parametrize("text, app, team, experience", CASES)
+def test_labelled_messages(text, app, team, experience):
+    assert tuple(extract_entities(text)) == (app, team, experience)
+
+
+@pytest.mark.parametrize("text", FALSE_POSITIVES)
+def test_inflected_words_are_not_apps(text):
+    assert extract_entities(text).app is None
+
+
+@pytest.mark.parametrize("text, app, team", [
+    ("I'm on andriod for uplfit", "uplift", "android"),
+    ("coursgrab backend", "coursegrab", "backend"),
+    ("eatrey ios", "eatery", "ios"),
+])
+def test_typos_still_resolve(text, app, team):
+    found = extract_entities(text)
+    assert (found.app, found.team) == (app, team)
@@ -0,0 +1,45 @@
+import glob
+import os
+
+import pytest
+
+from bench_readme_prep import SAMPLES
+from readme_prep import CHARS_PER_TOKEN, prepare_readme, setup_commands, strip_noise
+
+READMES = sorted(glob.glob(os.path.join(SAMPLES, "*.md")))
+
+
+def _load(path: str) -> tuple[str, str]:
+    team = os.path.basename(path)[:-3].rpartition("-")[2]
+    with open(path) as f:
+        return team, f.read()
+
+
+@pytest.mark.parametrize("path", READMES, ids=os.path.basename)
+def test_setup_commands_survive(path):
+    team, readme = _load(path)
+    commands = setup_commands(readme)
+    assert commands, "sample should exercise at least one setup command"
+    prepared = prepare_readme(readme, team)
+    assert [c for c in commands if c not in prepared] == []
+
+
+@pytest.mark.parametrize("path", READMES, ids=os.path.basename)
+def test_prepared_readme_is_smaller_and_clean(path):
+    team, readme = _load(path)
+    prepared = prepare_readme(readme, team)
+    assert len(prepared) < len(readme)
+    assert "<img" not in prepared and "![" not in prepared
+
+
+def test_budget_keeps_setup_over_prose():
+    readme = ("# App\nWhat it is.\n\n## History\n" + "Long story. " * 400
+              + "\n\n## Setup\n```\nnpm install\nnpm run dev\n```\n")
+    prepared = prepare_readme(readme, "backend", budget_tokens=300)
+    assert len(prepared) <= 300 * CHARS_PER_TOKEN
+    assert "npm install" in prepared and "Long story" not in prepared
+
+
+def test_code_fences_kept_verbatim():
+    readme = "## Setup\n```html\n<div><img src='x.png'></div>\n```\n"
+    assert "<img src='x.png'>" in strip_noise(readme)
@@ -0,0 +1,34 @@
+import json
+import os
+
+import pytest
+
+from slack_format import SLACK_SECTION_LIMIT, markdown_to_mrkdwn, mrkdwn_to_blocks
+
+GOLDEN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "markdown_golden.json")
+with open(GOLDEN) as f:
+    CASES = json.load(f)
+
+
+@pytest.mark.parametrize("case", CASES, ids=[case["name"] for case in CASES])
+def test_golden(case):
+    assert markdown_to_mrkdwn(case["input"]) == case["expected"]
+
+
+def test_blocks_split_on_titles_and_respect_section_limit():
+    steps = "\n".join(f"{i}. Run `make step{i}` " + "and wait " * 60 for i in range(1, 11))
+    guide = markdown_to_mrkdwn(f"**📱 About**\n\nAn app.\n\n**🛠️ Setup**\n\n{steps}")
+    blocks = mrkdwn_to_blocks(guide)
+    assert blocks[0]["text"]["text"].startswith("*📱 About*")
+    assert "Setup" not in blocks[0]["text"]["text"]
+    assert len(blocks) > 2
+    assert all(len(b["text"]["text"]) <= SLACK_SECTION_LIMIT for b in blocks)
+
+
+def test_blocks_never_split_a_code_fence():
+    fence = "```\n" + "\n".join(f"echo step {i}" for i in range(600)) + "\n```"
+    blocks = mrkdwn_to_blocks(f"*Setup*\n\n{fence}\n\nDone.")
+    texts = [b["text"]["text"] for b in blocks]
+    assert all(len(t) <= SLACK_SECTION_LIMIT and t.count("```") % 2 == 0 for t in texts)
+    # Nothing is truncated away.
+    assert all(f"echo step {i}\n" in "\n".join(texts) + "\n" for i in range(600))
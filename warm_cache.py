@@ -0,0 +1,88 @@
+"""Pre-generates onboarding guides so real users only hit warm caches.
+
+Usage: python warm_cache.py [--concurrency 4] [--apps resell,eatery] [--force]
+
+Covers ALLOWED_APPS x ALLOWED_TEAMS x experience levels. Repo resolutions are
+seeded from utils/apps.json, and a guide is only regenerated when the README
+it was built from has changed (or with --force). Gemini and GitHub calls draw
+from the same per-host budget as the running bot, at background priority.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from config import ALLOWED_APPS, ALLOWED_TEAMS, EXPERIENCE_LEVELS, load_apps
+from github_utils import fetch_readme, readme_found, repo_cache
+from summarize_repo import SummaryError, generate_summary, summary_cache, summary_sources, readme_digest
+from rate_limit import priority, BACKGROUND
+
+
+def seed_repo_cache(apps: list[str]) -> int:
+    """Records every (app, team) -> repo mapping apps.json already knows."""
+    known = {f"{prefix}-{suffix}" for prefix, entry in load_apps().items() for suffix in entry["repos"]}
+    seeded = 0
+    for app in apps:
+        for team in ALLOWED_TEAMS:
+            repo = f"{app}-{team}"
+            if repo in known and repo_cache.get(repo) is None:
+                repo_cache.set(repo, f"cuappdev/{repo}")
+                seeded += 1
+    return seeded
+
+
+def warm_one(app: str, team: str, experience: str, force: bool) -> str:
+    # Background calls leave part of each shared bucket for live users.
+    with priority(BACKGROUND):
+        return _warm_one(app, team, experience, force)
+
+
+def _warm_one(app: str, team: str, experience: str, force: bool) -> str:
+    cache_key = f"{app}-{team}-{experience}"
+    readme = fetch_readme(app, team)
+    if not readme_found(readme):
+        # Counted as failed, like a live request for this guide would be.
+        raise SummaryError(readme)
+    if not force and summary_cache.get(cache_key) is not None \
+            and summary_sources.get(cache_key) == readme_digest(readme):
+        return "unchanged"
+
+    generate_summary(app, team, experience, refresh=True)
+    return "generated"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=4, help="parallel generations")
+    parser.add_argument("--apps", help="comma-separated subset of apps (default: all)")
+    parser.add_argument("--force", action="store_true", help="regenerate even if the README is unchanged")
+    args = parser.parse_args()
+
+    apps = args.apps.split(",") if args.apps else ALLOWED_APPS
+    combos = [(a, t, e) for a in apps for t in ALLOWED_TEAMS for e in EXPERIENCE_LEVELS]
+    print(f"🌱 Seeded {seed_repo_cache(apps)} repo mappings from apps.json")
+
+    counts = {"generated": 0, "unchanged": 0, "failed": 0}
+    failures = []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = {pool.submit(warm_one, *combo, args.force): combo for combo in combos}
+        for done, future in enumerate(as_completed(futures), 1):
+            key = "-".join(futures[future])
+            try:
+                outcome = future.result()
+                counts[outcome] += 1
+                print(f"[{done}/{len(combos)}] {'✅' if outcome == 'generated' else '⏭️ '} {key} ({outcome})")
+            except Exception as e:
+                counts["failed"] += 1
+                failures.append((key, e))
+                print(f"[{done}/{len(combos)}] ❌ {key}: {e}")
+
+    elapsed = time.perf_counter() - start
+    print(f"\nDone in {elapsed:.1f}s — {counts['generated']} generated, "
+          f"{counts['unchanged']} unchanged, {counts['failed']} failed")
+    for key, error in failures:
+        print(f"  • {key}: {error}")
+
+
+if __name__ == "__main__":
+    main()
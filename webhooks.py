@@ -0,0 +1,103 @@
+"""GitHub push webhooks: regenerate cached guides whose README just changed."""
+import hashlib
+import hmac
+import os
+
+from config import ALLOWED_TEAMS, EXPERIENCE_LEVELS
+from github_utils import fetch_readme, readme_found, resolved_repo
+from metrics import Counter
+from rate_limit import priority, BACKGROUND
+from summarize_repo import SummaryError, generate_summary, summary_cache, summary_sources, readme_digest
+from workers import KeyedWorkerPool
+
+GITHUB_WEBHOOK_SECRET = os.getenv("GITHUB_WEBHOOK_SECRET")
+
+summary_refreshes = Counter("onboarding_summary_refreshes_total",
+                            "Webhook-triggered guide refreshes by outcome.", ("result",))
+
+# Refreshes for the same guide run in order; a burst of pushes can't stampede Gemini.
+refresh_pool = KeyedWorkerPool(max_workers=int(os.getenv("REFRESH_CONCURRENCY", 2)),
+                               max_pending=500, max_pending_per_key=2, name="summary-refresh")
+
+
+def verify_signature(body: bytes, signature: str | None, secret: str | None = None) -> bool:
+    """Checks GitHub's X-Hub-Signature-256 header against the raw request body."""
+    secret = secret or GITHUB_WEBHOOK_SECRET
+    if not secret or not signature or not signature.startswith("sha256="):
+        return False
+    expected = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+def _is_readme(path: str) -> bool:
+    return "/" not in path and path.lower().startswith("readme")
+
+
+def readme_changed(payload: dict) -> bool:
+    """True if a push to the default branch touched the root README."""
+    repository = payload.get("repository") or {}
+    branch = repository.get("default_branch")
+    if branch and payload.get("ref") != f"refs/heads/{branch}":
+        return False
+    return any(_is_readme(path)
+               for commit in payload.get("commits") or []
+               for path in commit.get("added", []) + commit.get("modified", []) + commit.get("removed", []))
+
+
+def affected_summaries(full_name: str) -> list[tuple[str, str, str]]:
+    """(app, team, experience) for every cached guide built from `full_name`'s README.
+
+    Walks the guides themselves (which don't expire) and resolves each one's
+    repo, so a guide is found even after its repo_cache mapping has lapsed.
+    """
+    full_name = full_name.lower()
+    affected, repos = [], {}
+    for cache_key in summary_cache.keys():
+        app, team, experience = (cache_key.rsplit("-", 2) + ["", ""])[:3]
+        if not app or team not in ALLOWED_TEAMS or experience not in EXPERIENCE_LEVELS:
+            continue
+        if (app, team) not in repos:
+            repos[(app, team)] = (resolved_repo(app, team) or "").lower()
+        if repos[(app, team)] == full_name:
+            affected.append((app, team, experience))
+    return affected
+
+
+def refresh_summary(app: str, team: str, experience: str) -> str:
+    """Regenerates one guide if its README changed; the cached copy is replaced only on success.
+
+    If the README can't be fetched right now (e.g. GitHub is down), the cached
+    guide is left alone rather than compared against the "not found" message.
+    """
+    cache_key = f"{app}-{team}-{experience}"
+    with priority(BACKGROUND):
+        readme = fetch_readme(app, team)
+        if not readme_found(readme):
+            result = "unavailable"
+        elif summary_sources.get(cache_key) == readme_digest(readme):
+            result = "unchanged"
+        else:
+            try:
+                generate_summary(app, team, experience, refresh=True)
+                result = "regenerated"
+            except SummaryError:
+                result = "failed"
+    summary_refreshes.inc(result=result)
+    print(f"🔄 Refresh of {cache_key}: {result}")
+    return result
+
+
+def handle_push(payload: dict) -> int:
+    """Queues refreshes for the guides a push affects; returns how many were queued."""
+    if not readme_changed(payload):
+        return 0
+    full_name = (payload.get("repository") or {}).get("full_name", "")
+    queued = 0
+    for app, team, experience in affected_summaries(full_name):
+        cache_key = f"{app}-{team}-{experience}"
+        if refresh_pool.submit(cache_key, refresh_summary, app, team, experience):
+            queued += 1
+        else:
+            summary_refreshes.inc(result="dropped")
+    print(f"📬 README push to {full_name}: {queued} guide(s) queued for refresh")
+    return queued
@@ -0,0 +1,69 @@
+import os
+import threading
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", 8))
+WORKER_MAX_QUEUE = int(os.getenv("WORKER_MAX_QUEUE", 200))
+WORKER_MAX_PER_USER = int(os.getenv("WORKER_MAX_PER_USER", 5))
+
+
+class KeyedWorkerPool:
+    """Bounded thread pool that runs jobs for the same key strictly in order.
+
+    Jobs for different keys run in parallel (up to max_workers); jobs sharing a
+    key are queued behind each other, so one user's messages are never handled
+    out of order. submit() returns False instead of blocking once the pool or a
+    single key's queue is full, letting the caller send a backpressure reply.
+    """
+
+    def __init__(self, max_workers: int = WORKER_CONCURRENCY, max_pending: int = WORKER_MAX_QUEUE,
+                 max_pending_per_key: int = WORKER_MAX_PER_USER, name: str = "worker"):
+        self.max_pending = max_pending
+        self.max_pending_per_key = max_pending_per_key
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._queues = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def submit(self, key, fn, *args, **kwargs) -> bool:
+        job = (fn, args, kwargs)
+        with self._lock:
+            if self._pending >= self.max_pending:
+                return False
+            queue = self._queues.get(key)
+            if queue is not None and len(queue) >= self.max_pending_per_key:
+                return False
+            self._pending += 1
+            if queue is not None:
+                queue.append(job)
+                return True
+            self._queues[key] = deque([job])
+        self._executor.submit(self._drain, key)
+        return True
+
+    def _drain(self, key):
+        # The running job stays at the head of its queue, so a key with an
+        # entry in self._queues always has exactly one drainer.
+        while True:
+            with self._lock:
+                fn, args, kwargs = self._queues[key][0]
+            try:
+                fn(*args, **kwargs)
+            except Exception:
+                print(f"❌ Background job for {key} failed:\n{traceback.format_exc()}")
+            with self._lock:
+                queue = self._queues[key]
+                queue.popleft()
+                self._pending -= 1
+                if not queue:
+                    del self._queues[key]
+                    return
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)